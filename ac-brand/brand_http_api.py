@@ -5,10 +5,13 @@ FastAPI-Based
 # import fastapi
 from sqlalchemy.orm import Session
 
-from methods.database.db_methods import get_db, load_db, populate_db
+from methods.database.db_methods import build_ingest_worker, get_db, load_db
 
-# Initialization
-"""DB INIT"""
-load_db()
-""" WEB3 FILTER -> DATABASE POPULATION """
-create_task(populate_db())
+
+if __name__ == "__main__":
+    # Initialization
+    """DB INIT"""
+    load_db()
+    """ WEB3 FILTER -> DATABASE POPULATION """
+    # Only started when run as a process, never as a side effect of import
+    build_ingest_worker().run()
@@ -2,3 +2,10 @@ export CONTRACT_ADDRESS=""
 export WEB3_URL=""
 export DATABASE_URL=""
 export IPFS_URL=""
+export INGEST_CHUNK_SIZE="2000"
+export INGEST_CONFIRMATIONS="0"
+export INGEST_START_BLOCK=""
+export INGEST_POLL_MIN="1"
+export INGEST_POLL_MAX="15"
+export INGEST_WS_URL=""
+export INGEST_POOL_SIZE="2"
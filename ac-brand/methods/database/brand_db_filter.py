@@ -1,73 +1,183 @@
 """
 Smart contract event log --> database population module
 """
+from collections import Counter
 from datetime import datetime
+from os import getenv
+from typing import Dict, List, Optional
 
-from sqlalchemy.orm import load_only
+from eth_utils import encode_hex, event_abi_to_log_topic
+from sqlalchemy import (
+    DateTime,
+    Integer,
+    column,
+    func,
+    insert,
+    literal,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
 
-from ..db_schemas import Item, TransferLog
+from .brand_db_schemas import BlockCheckpoint, Item, TransferLog
+
+
+INGEST_CHUNK_SIZE = int(getenv('INGEST_CHUNK_SIZE', '2000'))
+INGEST_CONFIRMATIONS = int(getenv('INGEST_CONFIRMATIONS', '0'))
+INGEST_START_BLOCK = getenv('INGEST_START_BLOCK')
+
+
+def dialect_insert(db: Session, model):
+    """
+    INSERT construct supporting ON CONFLICT for the bound database dialect
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        return sqlite_insert(model)
+    return postgresql_insert(model)
+
+
+def load_checkpoint(db: Session, name: str) -> Optional[int]:
+    """
+    Last fully processed block of named filter
+    """
+    checkpoint = db.query(BlockCheckpoint).filter(
+        BlockCheckpoint.name == name).first()
+    return checkpoint.block if checkpoint else None
+
+
+def save_checkpoint(db: Session, name: str, block: int) -> None:
+    """
+    Stage checkpoint of named filter (committed by caller)
+    """
+    db.merge(BlockCheckpoint(name=name, block=block))
 
 
 class ItemFilters:
     """
     Smart contract event log filter -
     Checks for mint, burn and transfer events
+    Resumes from the last processed block stored in block_checkpoints
     """
-    def __init__(self, db, contract):
+    def __init__(self, db, contract, name: str = "items"):
         self.db = db
-        self.mintfilter = contract.events.Mint.createFilter(fromBlock="latest")
-        self.burnfilter = contract.events.Burn.createFilter(fromBlock="latest")
-        self.transferfilter = contract.events.ItemTransfer.createFilter(
-            fromBlock="latest")
+        self.w3 = contract.web3
+        self.address = contract.address
+        self.name = name
+        self.events = {}
+        for event in (contract.events.Mint(), contract.events.Burn(),
+                      contract.events.ItemTransfer()):
+            self.events[event_abi_to_log_topic(event.abi)] = event
+        self.checkpoint = load_checkpoint(db, name)
+        if self.checkpoint is None:
+            # First run starts from INGEST_START_BLOCK, or the chain head
+            if INGEST_START_BLOCK:
+                self.checkpoint = int(INGEST_START_BLOCK) - 1
+            else:
+                self.checkpoint = self.head()
+            save_checkpoint(db, name, self.checkpoint)
+            db.commit()
 
-    def filter(self) -> bool:
+    def head(self) -> int:
         """
-        Filter function
+        Latest block considered final
+        """
+        return self.w3.eth.block_number - INGEST_CONFIRMATIONS
+
+    def get_events(self, from_block: int,
+                   to_block: int) -> Dict[str, List[dict]]:
+        """
+        Fetch and decode all filtered events within block range
+        """
+        logs = self.w3.eth.get_logs({
+            'address': self.address,
+            'fromBlock': from_block,
+            'toBlock': to_block,
+            'topics': [[encode_hex(topic) for topic in self.events]]
+        })
+        events = {'Mint': [], 'Burn': [], 'ItemTransfer': []}
+        for log in logs:
+            event = self.events[bytes(log['topics'][0])]
+            events[event.event_name].append(event.processLog(log))
+        return events
+
+    def apply(self, events: Dict[str, List[dict]]) -> None:
+        """
+        Stage decoded events as bulk statements (committed by caller)
+        Replays are idempotent: mints are upserted, burns are set-based
+        deletes and transfers only ever commit alongside the checkpoint
+        Transfer statistics follow the previous per-event semantics:
+        holdtime_avg = elapsed time / (transfers - 1)
         """
         current_time = datetime.now()
 
-        mints = self.mintfilter.get_new_entries()
-        burns = self.burnfilter.get_new_entries()
-        transfers = self.transferfilter.get_new_entries()
+        mints = events['Mint']
+        burns = events['Burn']
+        transfers = events['ItemTransfer']
 
         if mints:
-            for mint in mints:
-                item_id = mint['args']['itemid']
-                db_item = Item(id=item_id,
-                               creation_date=datetime.now(),
-                               transfers=0)
-                self.db.add(db_item)
-                self.db.commit()
+            self.db.execute(
+                dialect_insert(self.db, Item).values([{
+                    'id': mint['args']['itemid'],
+                    'creation_date': current_time,
+                    'transfers': 0
+                } for mint in mints]).on_conflict_do_nothing(
+                    index_elements=['id']))
 
         if burns:
-            for burn in burns:
-                item_id = burn['args']['itemid']
-                self.db.query(Item).filter(id=item_id).delete()
-                self.db.commit()
+            burned_ids = [burn['args']['itemid'] for burn in burns]
+            self.db.query(Item).filter(Item.id.in_(burned_ids)).delete(
+                synchronize_session=False)
 
         if transfers:
-            for transfer in transfers:
-                item_id = transfer['args']['itemid']
-                item_obj = self.db.query(Item).filter(
-                    Item.id == item_id).options(
-                        load_only('transfers', 'creation_date')).first()
-                elapsed_time = current_time - item_obj.creation_date
-                try:
-                    avg_hold_time = elapsed_time / item_obj.transfers
-                except ZeroDivisionError:
-                    avg_hold_time = elapsed_time
-                self.db.query(Item).filter(Item.id == item_id).update({
-                    'transfers':
-                    item_obj.transfers + 1,
-                    'holdtime_avg':
-                    avg_hold_time
-                })
-                logged_transfer = TransferLog(
-                    item_id=item_id,
-                    date=current_time,
-                    sent_to=transfer['args']['to'],
-                    sent_from=transfer['args']['from'])
-                self.db.add(logged_transfer)
+            # Transfer logs are written in one multi-row INSERT
+            self.db.execute(
+                insert(TransferLog).values([{
+                    'item_id': transfer['args']['itemid'],
+                    'date': current_time,
+                    'sent_to': bytes(transfer['args']['to'], 'utf-8'),
+                    'sent_from': bytes(transfer['args']['from'], 'utf-8')
+                } for transfer in transfers]))
+            # Statistics of every transferred item are updated in one
+            # UPDATE ... FROM (VALUES ...), counting repeat transfers of an
+            # item within the range; the average equals applying them in turn
+            transfer_counts = Counter(transfer['args']['itemid']
+                                      for transfer in transfers)
+            batch = values(column('item_id', Integer),
+                           column('transfer_count', Integer),
+                           name="batch").data(list(transfer_counts.items()))
+            total_transfers = Item.transfers + batch.c.transfer_count
+            elapsed_time = literal(current_time, DateTime) - Item.creation_date
+            avg_hold_time = elapsed_time / func.greatest(total_transfers - 1, 1)
+            self.db.execute(
+                update(Item).where(Item.id == batch.c.item_id).values(
+                    transfers=total_transfers,
+                    holdtime_avg=avg_hold_time).execution_options(
+                        synchronize_session=False))
+
+    def filter(self) -> int:
+        """
+        Filter function
+        Processes every block since the checkpoint in chunked get_logs
+        ranges - backfilling any downtime gap on the first call, then
+        tailing new blocks on subsequent calls
+        Returns number of events ingested
+        """
+        ingested = 0
+        head = self.head()
+        while self.checkpoint < head:
+            to_block = min(self.checkpoint + INGEST_CHUNK_SIZE, head)
+            events = self.get_events(self.checkpoint + 1, to_block)
+            # Events and checkpoint of each range share one transaction
+            try:
+                self.apply(events)
+                save_checkpoint(self.db, self.name, to_block)
                 self.db.commit()
+            except Exception:
+                self.db.rollback()
+                raise
+            self.checkpoint = to_block
+            ingested += sum(len(logs) for logs in events.values())
 
-        return True
+        return ingested
@@ -0,0 +1,122 @@
+"""
+Event ingestion worker
+Runs the event log filters outside of the API event loop
+Fork of ac-main/methods/database/db_ingest.py - ac-brand is built into
+its own image (see Dockerfile) without ac-main on its path, so fixes
+must be applied to both copies
+"""
+import json
+import logging
+from asyncio import run
+from os import getenv
+from threading import Event, Thread
+from typing import Callable, Optional
+
+import websockets
+
+
+INGEST_POLL_MIN = float(getenv('INGEST_POLL_MIN', '1'))
+INGEST_POLL_MAX = float(getenv('INGEST_POLL_MAX', '15'))
+INGEST_WS_URL = getenv('INGEST_WS_URL')
+
+logger = logging.getLogger(__name__)
+
+
+class IngestWorker:
+    """
+    Event ingestion worker -
+    Polls filter adaptively: immediately again while events keep
+    arriving, doubling the interval (up to poll_max) while idle.
+    A websocket newHeads subscription, when configured, wakes the
+    worker as soon as a block is produced
+    """
+    def __init__(self,
+                 filter_factory: Callable,
+                 poll_min: float = INGEST_POLL_MIN,
+                 poll_max: float = INGEST_POLL_MAX,
+                 ws_url: Optional[str] = INGEST_WS_URL):
+        self.filter_factory = filter_factory
+        self.poll_min = poll_min
+        self.poll_max = poll_max
+        self.ws_url = ws_url
+        self.interval = poll_min
+        self.wakeup = Event()
+        self.stopped = Event()
+        self.threads = []
+        self.itemfilter = None
+
+    def poll(self) -> int:
+        """
+        Run one filter pass, returns number of events ingested
+        """
+        if self.itemfilter is None:
+            self.itemfilter = self.filter_factory()
+        return self.itemfilter.filter()
+
+    def run(self) -> None:
+        """
+        Blocking poll loop
+        """
+        if self.ws_url:
+            self._start_thread(self._subscribe_heads, "ingest-heads")
+        while not self.stopped.is_set():
+            try:
+                ingested = self.poll()
+            except Exception:
+                logger.exception("Event ingestion failed")
+                ingested = 0
+                # Rebuild filter (and its session) after failures
+                if self.itemfilter is not None:
+                    self.itemfilter.db.close()
+                    self.itemfilter = None
+            if ingested:
+                # Catching up: polled again without waiting
+                self.interval = self.poll_min
+                continue
+            self.interval = min(self.interval * 2, self.poll_max)
+            self.wakeup.wait(self.interval)
+            self.wakeup.clear()
+
+    def _subscribe_heads(self) -> None:
+        """
+        Wake poll loop on every new block head
+        """
+        while not self.stopped.is_set():
+            try:
+                run(self._listen_heads())
+            except Exception:
+                logger.warning("newHeads subscription lost, reconnecting")
+                self.stopped.wait(self.poll_max)
+
+    async def _listen_heads(self) -> None:
+        async with websockets.connect(self.ws_url) as socket:
+            await socket.send(
+                json.dumps({
+                    'jsonrpc': "2.0",
+                    'id': 1,
+                    'method': "eth_subscribe",
+                    'params': ["newHeads"]
+                }))
+            async for _ in socket:
+                if self.stopped.is_set():
+                    return
+                self.wakeup.set()
+
+    def _start_thread(self, target: Callable, name: str) -> Thread:
+        thread = Thread(target=target, name=name, daemon=True)
+        thread.start()
+        self.threads.append(thread)
+        return thread
+
+    def start(self) -> Thread:
+        """
+        Run poll loop in a background thread
+        """
+        return self._start_thread(self.run, "ingest")
+
+    def stop(self) -> None:
+        """
+        Stop poll loop and subscription
+        """
+        self.stopped.set()
+        self.wakeup.set()
@@ -1,7 +1,7 @@
 """
 Database schemas
 """
-from sqlalchemy import Column, DateTime, Integer, Interval
+from sqlalchemy import BigInteger, Column, DateTime, Integer, Interval, String
 from sqlalchemy.types import LargeBinary
 
 from .database import Base
@@ -28,3 +28,13 @@ class TransferLog(Base):
     date = Column(DateTime)
     sent_to = Column(LargeBinary, index=True)
     sent_from = Column(LargeBinary, index=True)
+
+
+class BlockCheckpoint(Base):
+    """
+    Event Ingestion Checkpoint Table
+    Last fully processed block per event filter
+    """
+    __tablename__ = "block_checkpoints"
+    name = Column(String, primary_key=True)
+    block = Column(BigInteger)
@@ -0,0 +1,26 @@
+"""
+Database connectivity
+Using PostgreSQL
+"""
+from os import getenv
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import sessionmaker
+
+
+# Connecting to database and creating a usage session
+DATABASE_URL = getenv('DATABASE_URL')
+engine = create_engine(DATABASE_URL)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Dedicated pool for the event ingestion worker
+ingest_engine = create_engine(DATABASE_URL,
+                              pool_size=int(getenv('INGEST_POOL_SIZE', '2')),
+                              max_overflow=0)
+IngestSessionLocal = sessionmaker(autocommit=False,
+                                  autoflush=False,
+                                  bind=ingest_engine)
+
+# Base class declaration
+Base = declarative_base()
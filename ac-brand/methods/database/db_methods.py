@@ -0,0 +1,36 @@
+"""
+Database methods
+"""
+from sqlalchemy.orm import Session
+
+from ..onchain.brand_onchain_config import get_item_contract
+from .brand_db_filter import ItemFilters
+from .brand_db_ingest import IngestWorker
+from .database import Base, IngestSessionLocal, SessionLocal, engine
+
+
+def load_db() -> bool:
+    """
+    Creates database tables
+    """
+    Base.metadata.create_all(bind=engine)
+    return True
+
+
+def build_ingest_worker() -> IngestWorker:
+    """
+    Brand item contract event log filter -> database population worker
+    """
+    return IngestWorker(
+        lambda: ItemFilters(IngestSessionLocal(), get_item_contract()))
+
+
+def get_db() -> Session:
+    """
+    Database context manager
+    """
+    db_session = SessionLocal()
+    try:
+        yield db_session
+    finally:
+        db_session.close()
@@ -0,0 +1,18 @@
+"""
+On-Chain Configuration
+"""
+from os import getenv
+
+from web3 import Web3
+
+from .ItemContractABI import ItemContractABI
+
+
+def get_item_contract():
+    """
+    Brand item contract instance
+    ItemContractABI is supplied alongside the deployed contract, as in ac-main
+    """
+    w3 = Web3(Web3.HTTPProvider(getenv('WEB3_URL')))
+    return w3.eth.contract(address=getenv('CONTRACT_ADDRESS'),
+                           abi=ItemContractABI)
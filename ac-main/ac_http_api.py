@@ -2,45 +2,128 @@
 Authentichain HTTP API
 FastAPI-Based
 """
-from asyncio import create_task
-from datetime import timedelta
-from typing import List
-
-from fastapi import Depends, FastAPI, HTTPException, Request, status
-from fastapi.responses import JSONResponse
+from asyncio import sleep, wait_for
+from contextlib import asynccontextmanager
+from os import getenv
+from time import monotonic
+from typing import AsyncIterator, List, Optional, Union
+
+from fastapi import (
+    Depends,
+    FastAPI,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    status,
+)
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session, load_only
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 
+from methods.cryptography.kdf_methods import run_kdf
 from methods.database import db_schemas
-from methods.database.database import ipfs
-from methods.database.db_methods import get_db, load_db, populate_db
+from methods.database.database import dispose_async_engine, get_ipfs
+from methods.database.db_methods import (
+    build_ingest_worker,
+    get_async_db,
+    get_db,
+    load_db,
+    warm_caches,
+)
 from methods.exceptions.exception_objects import (
+    CodeRenderError,
+    MetadataFetchError,
     NonExistentTokenError,
     NotClaimableError,
     NotOperatorError,
     OwnershipError,
     PrivateKeyError,
+    SignerSessionError,
     UnknownAccountError,
 )
-from methods.fastapi.fastapi_methods import create_jwt, get_current_user
+from methods.fastapi.fastapi_methods import (
+    JWT_EXPIRY,
+    create_jwt,
+    get_current_user,
+)
 from methods.fastapi.fastapi_objects import Token, tags
 from methods.items import item_methods, item_objects
-from methods.onchain.onchain_config import w3
+from methods.items.item_etag import (
+    cache_headers,
+    etag_matches,
+    item_etag,
+    value_etag,
+)
+from methods.items.utils.qr_gen import code_renderer
+from methods.metrics.metrics_methods import (
+    METRICS_CONTENT_TYPE,
+    HTTPMetricsMiddleware,
+    registry,
+)
+from methods.onchain.onchain_async import call, run_onchain
+from methods.onchain.onchain_config import get_w3, signer_sessions
 from methods.onchain.onchain_methods import (
     build_burn_tx,
-    build_item_call,
+    build_item_call_async,
     build_item_tx,
+    build_items_call,
+    build_items_tx,
     build_mint_tx,
+    resolve_signer,
+    unlock_account,
 )
+from methods.onchain.onchain_receipts import receipt_tracker
 from methods.users import user_methods, user_objects
 
+
+TX_WAIT_INTERVAL = 0.25  # Long-poll status re-check interval (seconds)
+BULK_TRANSFER_LIMIT = int(getenv('BULK_TRANSFER_LIMIT', '500'))
+BULK_READ_LIMIT = int(getenv('BULK_READ_LIMIT', '200'))
+LABEL_BATCH_LIMIT = int(getenv('LABEL_BATCH_LIMIT', '1000'))
+
+READY_TIMEOUT = float(getenv('READY_TIMEOUT', '2'))
+
+
 # Initialization
-""" DB INIT """
-load_db()
-""" WEB3 FILTER -> DATABASE POPULATION """
-create_task(populate_db())
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    Application lifespan -
+    Creates tables, warms caches and starts background workers once the
+    server starts (rather than on import), stopping them on shutdown
+    """
+    """ DB INIT """
+    load_db()
+    warm_caches()
+    """ WEB3 FILTER -> DATABASE POPULATION """
+    # Deployed separately by default (see ingest_worker.py), as every
+    # server worker process would otherwise run its own ingester;
+    # single-process deployments may run it in a thread instead
+    ingest_worker = None
+    if getenv('INGEST_IN_PROCESS', "false") == "true":
+        ingest_worker = build_ingest_worker()
+        ingest_worker.start()
+    app.state.ready = True
+    try:
+        yield
+    finally:
+        app.state.ready = False
+        if ingest_worker is not None:
+            ingest_worker.stop()
+        receipt_tracker.stop()
+        code_renderer.shutdown()
+        await dispose_async_engine()
+
+
 """ FASTAPI INIT """
 app = FastAPI()
+app.state.ready = False
+app.router.lifespan_context = lifespan
+app.add_middleware(HTTPMetricsMiddleware)
 
 
 # Error Handling
@@ -98,16 +181,51 @@ async def badacc_handler(request: Request,
     )
 
 
+@app.exception_handler(SignerSessionError)
+async def signer_handler(request: Request,
+                         exc: SignerSessionError) -> JSONResponse:
+    return JSONResponse(
+        status_code=401,
+        content={"message": f"{exc.message}"},
+    )
+
+
+@app.exception_handler(CodeRenderError)
+async def render_handler(request: Request,
+                         exc: CodeRenderError) -> JSONResponse:
+    return JSONResponse(
+        status_code=422,
+        content={
+            "message": f"{exc.message}",
+            "index": exc.index
+        },
+    )
+
+
+@app.exception_handler(MetadataFetchError)
+async def metadata_handler(request: Request,
+                           exc: MetadataFetchError) -> JSONResponse:
+    return JSONResponse(
+        status_code=504,
+        content={"message": f"{exc.message}"},
+    )
+
+
 # API Methods
 @app.post("/users/create", response_model=user_objects.User, tags=[tags[0]])
 async def create_user(
-    user_obj: user_objects.UserBase, database: Session = Depends(get_db)
+    user_obj: user_objects.UserBase,
+    database: Session = Depends(get_db),
+    async_database: AsyncSession = Depends(get_async_db)
 ) -> db_schemas.User:
     """
     Create user account
     """
-    db_username = user_methods.get_user_by(database, user_obj.username)
-    db_email = user_methods.get_user_by(database, user_obj.email)
+    db_username = user_obj.username and await (
+        user_methods.get_user_by_field_async(async_database, "username",
+                                             user_obj.username, 'id'))
+    db_email = user_obj.email and await user_methods.get_user_by_field_async(
+        async_database, "email", user_obj.email, 'id')
     if db_username:
         raise HTTPException(
             status_code=400,
@@ -117,7 +235,8 @@ async def create_user(
         raise HTTPException(
             status_code=400,
             detail=f"Email has already been {user_obj.email} registered.")
-    new_user = user_methods.create_user(database, w3, user_obj)
+    new_user = await run_kdf(user_methods.create_user, database, get_w3(),
+                             user_obj)
     return new_user
 
 
@@ -130,43 +249,74 @@ async def current_user_info(current_user: user_objects.User = Depends(
     return current_user
 
 
-# @app.get("/users/items/view", tags=[tags[0]])
-# async def view_items(current_user: user_objects.User = Depends(
-#     get_current_user),
-#                      database: Session = Depends(get_db)) -> List:
-#     """
-#     View owned items of currently logged in user
-#     """
-#     owned_items = item_methods.get_user_items(database, TXReqs(),
-#                                               current_user.publickey.decode())
-#     if not owned_items:
-#         raise HTTPException(status_code=404, detail="No items found.")
-#     return owned_items
+@app.get("/users/items/view", tags=[tags[0]])
+async def view_items(skip: int = 0,
+                     limit: int = Query(50, le=200),
+                     current_user: user_objects.User = Depends(
+                         get_current_user),
+                     database: Session = Depends(get_db)) -> List:
+    """
+    View owned items of currently logged in user
+    Paginated via skip/limit
+    """
+    owned_items = await run_onchain(item_methods.get_user_items, database,
+                                    current_user.publickey, skip, limit)
+    if not owned_items:
+        raise HTTPException(status_code=404, detail="No items found.")
+    return owned_items
 
 
 @app.post("/users/items/transfer", tags=[tags[0]])
 async def transfer_item(
     item_id: int,
     receiver_attr: str,
-    passkey: str,
+    passkey: Optional[str] = None,
+    signer: Optional[str] = None,
     current_user: user_objects.User = Depends(get_current_user),
     database: Session = Depends(get_db)
-) -> str:
+) -> dict:
     """
     Transfer item token
+    Confirmation can be followed via /tx/{tx_hash}
     """
-    transferred_item = item_methods.transfer_item(
-        item_id, receiver_attr,
-        build_item_tx(database, current_user, passkey, item_id), database)
-    if not transferred_item:
-        raise HTTPException(status_code=400, detail="Transfer failed.")
-    return f"Item {item_id} transferred to user {receiver_attr}."
+    tx_reqs = await run_onchain(build_item_tx, item_id, current_user,
+                                passkey, database,
+                                resolve_signer(signer, current_user))
+    tx_hash = await run_onchain(item_methods.transfer_item, item_id,
+                                receiver_attr, tx_reqs, database)
+    return {
+        "message": f"Item {item_id} transfer to {receiver_attr} submitted.",
+        "tx_hash": tx_hash
+    }
+
+
+@app.post("/users/items/transfer/bulk", tags=[tags[0]])
+async def transfer_item_bulk(
+    transfers: List[item_objects.ItemTransfer],
+    passkey: Optional[str] = None,
+    signer: Optional[str] = None,
+    current_user: user_objects.User = Depends(get_current_user),
+    database: Session = Depends(get_db)
+) -> List[dict]:
+    """
+    Transfer several item tokens in one pipelined submission
+    Returns per-item transaction hashes and failures
+    """
+    if len(transfers) > BULK_TRANSFER_LIMIT:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {BULK_TRANSFER_LIMIT} transfers per request.")
+    tx_reqs_map = await run_onchain(
+        build_items_tx, [transfer.item_id for transfer in transfers],
+        current_user, passkey, database, resolve_signer(signer, current_user))
+    return await run_onchain(item_methods.transfer_item_batch, transfers,
+                             tx_reqs_map, database)
 
 
 @app.get("/users/get", response_model=user_objects.UserDisplay, tags=[tags[0]])
-def get_user(
+async def get_user(
     user_attr: str,
-    database: Session = Depends(get_db),
+    database: AsyncSession = Depends(get_async_db),
     current_user: user_objects.User = Depends(get_current_user)
 ) -> db_schemas.User:
     """
@@ -177,7 +327,7 @@ def get_user(
         - user ID
         - e-mail
     """
-    db_user = user_methods.get_user_by(database, user_attr)
+    db_user = await user_methods.get_user_by_async(database, user_attr)
     if db_user is None:
         raise HTTPException(status_code=404, detail="User not found")
     return db_user
@@ -186,48 +336,71 @@ def get_user(
 @app.post("/items/create", tags=[tags[1]])
 async def create_item(
     item_obj_list: List[item_objects.ItemCreate],
-    passkey: str,
+    passkey: Optional[str] = None,
+    signer: Optional[str] = None,
+    batch: bool = False,
     database: Session = Depends(get_db),
     current_user: user_objects.User = Depends(get_current_user)
-) -> str:
+) -> Union[dict, List[dict]]:
     """
     Create item token
+    Batch mode mints all items in one pipelined submission and returns
+    per-item transaction hashes and failures
+    Confirmation can be followed via /tx/{tx_hash}
     """
-    created_item = item_methods.create_item(
-        item_obj_list, ipfs, build_mint_tx(current_user, passkey, database))
-    if not created_item:
-        raise HTTPException(status_code=400, detail="Item creation failed.")
-    return "Item created."
+    tx_reqs = await run_onchain(build_mint_tx, current_user, passkey,
+                                database, resolve_signer(signer, current_user))
+    # First use connects to IPFS, kept off the event loop
+    ipfs = await run_onchain(get_ipfs)
+    if batch:
+        return await run_onchain(item_methods.create_item_batch,
+                                 item_obj_list, ipfs, tx_reqs)
+    tx_hashes = await run_onchain(item_methods.create_item, item_obj_list,
+                                  ipfs, tx_reqs)
+    return {"message": "Item creation submitted.", "tx_hashes": tx_hashes}
 
 
 @app.post("/items/claim", tags=[tags[1]])
 async def claim_item(
     item_id: int,
-    passkey: str,
+    passkey: Optional[str] = None,
+    signer: Optional[str] = None,
     current_user: user_objects.User = Depends(get_current_user),
     database: Session = Depends(get_db)
-) -> str:
+) -> dict:
     """
     Claim Item Token
     """
-    item_methods.claim_item(
-        item_id, build_item_tx(database, current_user, passkey, item_id))
-    return f"Item {item_id} has been claimed"
+    tx_reqs = await run_onchain(build_item_tx, item_id, current_user,
+                                passkey, database,
+                                resolve_signer(signer, current_user))
+    tx_hash = await run_onchain(item_methods.claim_item, item_id, tx_reqs)
+    return {
+        "message": f"Item {item_id} claim submitted.",
+        "tx_hash": tx_hash
+    }
 
 
 @app.post("/items/set/claimability", tags=[tags[1]])
 async def toggle_item_claimability(
     item_id: int,
-    passkey: str,
+    passkey: Optional[str] = None,
+    signer: Optional[str] = None,
     current_user: user_objects.User = Depends(get_current_user),
     database: Session = Depends(get_db)
-) -> str:
+) -> dict:
     """
     Toggle item claimability
     """
-    item_methods.set_item_claimability(
-        item_id, build_item_tx(database, current_user, passkey, item_id))
-    return "Item claimability changed."
+    tx_reqs = await run_onchain(build_item_tx, item_id, current_user,
+                                passkey, database,
+                                resolve_signer(signer, current_user))
+    tx_hash = await run_onchain(item_methods.set_item_claimability, item_id,
+                                tx_reqs)
+    return {
+        "message": "Item claimability change submitted.",
+        "tx_hash": tx_hash
+    }
 
 
 # @app.post("/items/set/missing", tags=[tags[1]])
@@ -246,42 +419,70 @@ async def toggle_item_claimability(
 @app.post("/items/forfeit", tags=[tags[1]])
 async def forfeit_item(
     item_id: int,
-    passkey: str,
+    passkey: Optional[str] = None,
+    signer: Optional[str] = None,
     current_user: user_objects.User = Depends(get_current_user),
     database: Session = Depends(get_db)
-) -> str:
+) -> dict:
     """
     Forfeit/burn Item Token
     """
-    item_methods.burn_item_token(
-        item_id, build_burn_tx(item_id, current_user, passkey, database))
-    return f"Item {item_id} forfeited."
+    tx_reqs = await run_onchain(build_burn_tx, item_id, current_user,
+                                passkey, database,
+                                resolve_signer(signer, current_user))
+    tx_hash = await run_onchain(item_methods.burn_item_token, item_id,
+                                tx_reqs)
+    return {
+        "message": f"Item {item_id} forfeit submitted.",
+        "tx_hash": tx_hash
+    }
 
 
 @app.get("/items/get", response_model=item_objects.Item, tags=[tags[1]])
-def get_item(
-    item_id: int, database: Session = Depends(get_db)) -> item_objects.Item:
+async def get_item(
+    item_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    database: AsyncSession = Depends(get_async_db)
+) -> item_objects.Item:
     """
     Display item token details by ID
+    Answers If-None-Match with 304 while the ETag is unchanged
     """
-    item_obj = item_methods.get_item(item_id,
-                                     build_item_call(item_id, database))
+    etag = await item_etag(database, item_id)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=cache_headers(etag))
+    item_obj = await run_onchain(item_methods.get_item, item_id, await
+                                 build_item_call_async(item_id, database))
     if item_obj is None:
         raise HTTPException(status_code=404, detail="Item not found")
+    if etag is None:
+        # Re-derived, as the metadata CID is now cached
+        etag = await item_etag(database, item_id)
+    response.headers.update(cache_headers(etag))
     return item_obj
 
 
 @app.get("/items/view/claimability", tags=[tags[1]])
 async def view_item_claimability(
     item_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     current_user: user_objects.User = Depends(get_current_user),
-    database: Session = Depends(get_db)
+    database: AsyncSession = Depends(get_async_db)
 ) -> str:
     """
     View item claimability
+    Answers If-None-Match with 304 while the claimability is unchanged
     """
-    item_claimability = item_methods.get_item_claimability(
-        item_id, build_item_call(item_id, database))
+    item_claimability = await run_onchain(
+        item_methods.get_item_claimability, item_id, await
+        build_item_call_async(item_id, database))
+    etag = value_etag("claimability", item_id, item_claimability)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304,
+                        headers=cache_headers(etag, private=True))
+    response.headers.update(cache_headers(etag, private=True))
     return f"Item claimability status: {item_claimability}"
 
 
@@ -289,35 +490,216 @@ async def view_item_claimability(
          response_model=user_objects.UserDisplay,
          tags=[tags[1]])
 async def view_item_owner(
-    item_id: int, database: Session = Depends(get_db)) -> db_schemas.User:
+    item_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    database: AsyncSession = Depends(get_async_db)
+) -> db_schemas.User:
     """
     View owner of provided item token
+    Answers If-None-Match with 304 while the owner is unchanged
     """
-    tx_reqs = build_item_call(item_id, database)
+    tx_reqs = await build_item_call_async(item_id, database)
     try:
-        owner_publickey = tx_reqs.contract.functions.ownerOf(item_id).call()
+        owner_publickey = await call(
+            tx_reqs.contract.functions.ownerOf(item_id))
     except:
         raise NonExistentTokenError
-    owner_obj = database.query(db_schemas.User).filter(
-        db_schemas.User.publickey == owner_publickey).options(
-            load_only('id', 'publickey', 'username')).first()
+    etag = value_etag("owner", item_id, owner_publickey)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=cache_headers(etag))
+    response.headers.update(cache_headers(etag))
+    owner_obj = await user_methods.get_user_by_field_async(
+        database, "publickey", owner_publickey, 'id', 'publickey', 'username')
     return owner_obj
 
 
+def check_bulk_read(item_ids: List[int]) -> None:
+    if len(item_ids) > BULK_READ_LIMIT:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {BULK_READ_LIMIT} items per request.")
+
+
+@app.get("/items/get/bulk", tags=[tags[1]])
+async def get_items(item_ids: List[int] = Query(...),
+                    database: Session = Depends(get_db)) -> List[dict]:
+    """
+    Display details of several item tokens
+    Returns per-item metadata and failures
+    """
+    check_bulk_read(item_ids)
+    tx_reqs_map = await run_onchain(build_items_call, item_ids, database)
+    return await run_onchain(item_methods.get_items, item_ids, tx_reqs_map)
+
+
+@app.get("/items/view/claimability/bulk", tags=[tags[1]])
+async def view_items_claimability(
+    item_ids: List[int] = Query(...),
+    current_user: user_objects.User = Depends(get_current_user),
+    database: Session = Depends(get_db)
+) -> List[dict]:
+    """
+    View claimability of several items
+    Returns per-item claimability and failures
+    """
+    check_bulk_read(item_ids)
+    tx_reqs_map = await run_onchain(build_items_call, item_ids, database)
+    return await run_onchain(item_methods.read_items, item_ids, tx_reqs_map,
+                             "viewItemClaimability")
+
+
+@app.get("/items/view/owner/bulk", tags=[tags[1]])
+async def view_items_owner(item_ids: List[int] = Query(...),
+                           database: Session = Depends(get_db)) -> List[dict]:
+    """
+    View owners of several item tokens
+    Returns per-item owners and failures
+    """
+    check_bulk_read(item_ids)
+    tx_reqs_map = await run_onchain(build_items_call, item_ids, database)
+    return await run_onchain(item_methods.get_items_owner, item_ids,
+                             tx_reqs_map, database)
+
+
+@app.get("/tx/{tx_hash}", tags=[tags[2]])
+async def view_transaction(tx_hash: str,
+                           wait: float = Query(0, ge=0, le=30)) -> dict:
+    """
+    View status of a submitted transaction
+    Statuses: pending, confirmed, failed, dropped, unknown
+    Transactions not tracked by this process are looked up on chain
+    With wait > 0, holds the request (long-poll) for up to wait seconds
+    until the transaction leaves the pending state
+    """
+    try:
+        tx_status = await run_onchain(receipt_tracker.status, tx_hash)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Malformed tx hash")
+    deadline = monotonic() + wait
+    while tx_status['status'] == "pending" and monotonic() < deadline:
+        await sleep(min(TX_WAIT_INTERVAL, deadline - monotonic()))
+        tx_status = await run_onchain(receipt_tracker.status, tx_hash)
+    return tx_status
+
+
+@app.post("/labels", tags=[tags[2]])
+async def generate_labels(
+    codes: List[item_objects.LabelCode],
+    output_format: str = Query("zip", regex="^(zip|pdf)$"),
+    current_user: user_objects.User = Depends(get_current_user)
+) -> Response:
+    """
+    Render a batch of QR/barcode labels
+    Every code is rendered before responding, so a code that cannot be
+    rendered fails the request (422, naming its index) rather than
+    truncating the output
+    Returned as a zip of PNGs or a multi-page PDF
+    """
+    if not codes:
+        raise HTTPException(status_code=400, detail="No codes given.")
+    if len(codes) > LABEL_BATCH_LIMIT:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {LABEL_BATCH_LIMIT} codes per request.")
+    pngs = await code_renderer.render_many([(code.code_type, code.data)
+                                            for code in codes])
+    if output_format == "pdf":
+        pdf = await run_in_threadpool(code_renderer.build_pdf, pngs)
+        return Response(content=pdf, media_type="application/pdf")
+    return StreamingResponse(
+        code_renderer.stream_zip(pngs),
+        media_type="application/zip",
+        headers={"Content-Disposition": "attachment; filename=labels.zip"})
+
+
+@app.post("/signer/unlock", tags=[tags[0]])
+async def unlock_signer(
+    passkey: str,
+    current_user: user_objects.User = Depends(get_current_user)
+) -> dict:
+    """
+    Unlock account for signing, returns an opaque signer session handle
+    Pass it as `signer` instead of `passkey` to transaction endpoints
+    The handle is only valid on the worker process that issued it,
+    requires sticky routing (or a single worker) when load balanced
+    """
+    account = unlock_account(get_w3(), current_user.accesskey, passkey)
+    handle = signer_sessions.unlock(current_user.id, account)
+    return {"signer": handle, "idle_ttl": signer_sessions.idle_ttl}
+
+
+@app.post("/signer/lock", tags=[tags[0]])
+async def lock_signer(
+    signer: str,
+    current_user: user_objects.User = Depends(get_current_user)
+) -> str:
+    """
+    End signer session
+    """
+    signer_sessions.lock_session(signer, current_user.id)
+    return "Signer session ended."
+
+
+@app.get("/metrics", tags=[tags[2]])
+async def metrics() -> Response:
+    """
+    Application metrics in Prometheus text format
+    """
+    return Response(content=registry.render(), media_type=METRICS_CONTENT_TYPE)
+
+
+@app.get("/health", tags=[tags[2]])
+async def health() -> dict:
+    """
+    Liveness check, answered without touching dependencies
+    """
+    return {"status": "ok"}
+
+
+@app.get("/ready", tags=[tags[2]])
+async def ready(database: AsyncSession = Depends(get_async_db)) -> Response:
+    """
+    Readiness check -
+    Startup has completed and the database and chain node respond
+    within READY_TIMEOUT seconds
+    """
+    checks = {"startup": bool(app.state.ready)}
+    try:
+        await wait_for(database.execute(text("SELECT 1")), READY_TIMEOUT)
+        checks["database"] = True
+    except Exception:
+        checks["database"] = False
+    try:
+        await wait_for(run_onchain(lambda: get_w3().eth.block_number),
+                       READY_TIMEOUT)
+        checks["node"] = True
+    except Exception:
+        checks["node"] = False
+    ready_status = all(checks.values())
+    return JSONResponse(status_code=200 if ready_status else 503,
+                        content={
+                            "status":
+                            "ready" if ready_status else "unavailable",
+                            "checks": checks
+                        })
+
+
 @app.post("/token", response_model=Token, tags=[tags[2]])
-async def login_jwt_access(form_data: OAuth2PasswordRequestForm = Depends(),
-                           database: Session = Depends(get_db)) -> dict:
+async def login_jwt_access(
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    database: AsyncSession = Depends(get_async_db)
+) -> dict:
     """
     Create Json Web Token via+and user login
     """
-    user = user_methods.verify_user(database, form_data.username,
-                                    form_data.password)
+    user = await user_methods.authenticate_user(database, form_data.username,
+                                                form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
         )
-    jwt_expiry = timedelta(minutes=30)
     access_token = create_jwt(data={"id": str(user.id)},
-                              expires_delta=jwt_expiry)
+                              expires_delta=JWT_EXPIRY)
     return {"access_token": access_token}
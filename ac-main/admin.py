@@ -8,7 +8,7 @@ from cursesmenu import *
 from cursesmenu.items import *
 from methods.database import db_schemas
 from methods.database.database import SessionLocal
-from methods.onchain.onchain_config import w3
+from methods.onchain.onchain_config import gas_oracle, get_w3, nonce_manager
 from methods.users import user_methods
 
 Session = SessionLocal()
@@ -47,6 +47,7 @@ def credit_account():
     """
     user_attr, sender_key = input("(Select Recipient)> "), input(
         "(Provide senders private key)> ")
+    w3 = get_w3()
     send_amount = w3.toWei(input("(Amount to credit recipient)> "), 'ether')
     sender = w3.eth.account.privateKeyToAccount(sender_key)
     db_user = user_methods.get_user_publickey(Session, user_attr)
@@ -55,11 +56,13 @@ def credit_account():
         'value': send_amount,
         'from': sender.address,
         'gas': 21000,
-        'gasPrice': w3.eth.gasPrice,
-        'nonce': w3.eth.getTransactionCount(sender.address)
+        'chainId': w3.eth.chain_id,
+        'nonce': nonce_manager.next_nonce(sender.address),
+        **gas_oracle.fee_fields()
     }
     signed_tx = sender.signTransaction(raw_tx)
     w3.eth.sendRawTransaction(signed_tx.rawTransaction)
 
 
-user_interface()
+if __name__ == "__main__":
+    user_interface()
@@ -0,0 +1,83 @@
+# @version 0.3.9
+"""
+@title Benchmark Item Contract
+@notice Minimal brand item contract exposing the interface the API uses.
+        Deployed per operator as a copy of a template by BenchProxy, hence
+        initialize() rather than a constructor
+"""
+
+event ItemTransfer:
+    itemid: indexed(uint256)
+    to: indexed(address)
+
+proxy: public(address)
+operator: public(address)
+owners: HashMap[uint256, address]
+uris: HashMap[uint256, String[256]]
+claimable: HashMap[uint256, bool]
+
+
+@external
+def initialize(operator: address, proxy: address):
+    assert self.proxy == empty(address), "initialized"
+    self.operator = operator
+    self.proxy = proxy
+
+
+@external
+def mint(itemid: uint256, to: address, uri: String[256]):
+    assert msg.sender == self.proxy, "not proxy"
+    self.owners[itemid] = to
+    self.uris[itemid] = uri
+
+
+@external
+def burn(itemid: uint256):
+    assert msg.sender == self.proxy, "not proxy"
+    self.owners[itemid] = empty(address)
+    self.uris[itemid] = ""
+    self.claimable[itemid] = False
+
+
+@external
+def transferItemToken(itemid: uint256, to: address):
+    assert msg.sender == self.owners[itemid], "not owner"
+    self.owners[itemid] = to
+    self.claimable[itemid] = False
+    log ItemTransfer(itemid, to)
+
+
+@external
+def setItemClaimability(itemid: uint256):
+    assert msg.sender == self.owners[itemid], "not owner"
+    self.claimable[itemid] = True
+
+
+@external
+def claimItemToken(itemid: uint256):
+    assert self.claimable[itemid], "not claimable"
+    self.owners[itemid] = msg.sender
+    self.claimable[itemid] = False
+    log ItemTransfer(itemid, msg.sender)
+
+
+@view
+@external
+def ownerOf(itemid: uint256) -> address:
+    owner: address = self.owners[itemid]
+    assert owner != empty(address), "nonexistent token"
+    return owner
+
+
+@view
+@external
+def tokenURI(itemid: uint256) -> String[256]:
+    assert self.owners[itemid] != empty(address), "nonexistent token"
+    return self.uris[itemid]
+
+
+@view
+@external
+def viewItemClaimability(itemid: uint256) -> bool:
+    assert self.owners[itemid] != empty(address), "nonexistent token"
+    return self.claimable[itemid]
@@ -0,0 +1,63 @@
+# @version 0.3.9
+"""
+@title Benchmark Proxy Contract
+@notice Minimal proxy exposing the interface the API uses: deploys a
+        BenchItem contract per operator and mints/burns through it
+"""
+
+interface BenchItem:
+    def initialize(operator: address, proxy: address): nonpayable
+    def mint(itemid: uint256, to: address, uri: String[256]): nonpayable
+    def burn(itemid: uint256): nonpayable
+    def ownerOf(itemid: uint256) -> address: view
+
+event Mint:
+    itemid: indexed(uint256)
+    contadr: indexed(address)
+
+event Burn:
+    itemid: indexed(uint256)
+    contadr: indexed(address)
+
+event Deploy:
+    operator: indexed(address)
+    contadr: address
+
+admin: public(address)
+template: public(address)
+operators: public(HashMap[address, address])
+nextItemId: public(uint256)
+
+
+@external
+def __init__(template: address):
+    self.admin = msg.sender
+    self.template = template
+    self.nextItemId = 1
+
+
+@external
+def deployContract(operator: address) -> address:
+    assert msg.sender == self.admin, "not admin"
+    contadr: address = create_copy_of(self.template)
+    BenchItem(contadr).initialize(operator, self)
+    self.operators[operator] = contadr
+    log Deploy(operator, contadr)
+    return contadr
+
+
+@external
+def MintToken(target: address, uri: String[256]):
+    assert self.operators[msg.sender] == target, "not operator"
+    itemid: uint256 = self.nextItemId
+    self.nextItemId = itemid + 1
+    BenchItem(target).mint(itemid, msg.sender, uri)
+    log Mint(itemid, target)
+
+
+@external
+def BurnToken(target: address, itemid: uint256):
+    assert self.operators[msg.sender] == target, "not operator"
+    assert BenchItem(target).ownerOf(itemid) == msg.sender, "not owner"
+    BenchItem(target).burn(itemid)
+    log Burn(itemid, target)
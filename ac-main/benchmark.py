@@ -0,0 +1,505 @@
+"""
+Authentichain Benchmark Harness
+Boots the API against local stand-ins - an in-process EVM (eth-tester)
+served over JSON-RPC, an in-memory IPFS and SQLite (or --database-url) -
+then drives its main endpoints at a fixed concurrency, reporting
+p50/p99 latency and requests per second as JSON
+
+Contract artifacts are JSON files with "abi" (and, for the proxy,
+"bytecode") keys. Brand item contracts are deployed through the proxy
+by calling --deploy-fn with the operators address, from the deployer
+account (eth-tester account 0). An item artifact carrying "bytecode" is
+deployed first, and its address passed to the proxy constructor as the
+template brand contracts are copied from
+
+By default the minimal contracts in bench_contracts/ are used (Vyper
+sources bundled with their compiled artifacts), so no external build
+is needed
+
+Requires the web3 tester extra: pip install "web3[tester]==5.23.0"
+
+Usage:
+    python benchmark.py --requests 200 --concurrency 16 --output bench.json
+    python benchmark.py --proxy-artifact Proxy.json \\
+        --item-artifact Item.json --deploy-fn deployContract
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import types
+from datetime import datetime, timezone
+from hashlib import sha256
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from math import ceil
+from secrets import token_hex
+from threading import Lock, Thread
+from time import perf_counter, sleep
+from typing import Callable, List, Mapping
+
+import aiohttp
+import ipfshttpclient
+import rlp
+import uvicorn
+from eth_account import Account
+from eth_utils import big_endian_to_int, keccak
+from hexbytes import HexBytes
+from web3 import EthereumTesterProvider, Web3
+from web3.datastructures import NamedElementOnion
+
+
+HOST = "127.0.0.1"
+PASSKEY = "benchmark-passkey"
+BENCH_CONTRACTS = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                               "bench_contracts")
+
+
+class FakeIPFS:
+    """
+    In-memory IPFS client stand-in (add_json/cat)
+    """
+    def __init__(self):
+        self.lock = Lock()
+        self.objects = {}
+
+    def add_json(self, obj, **kwargs) -> str:
+        data = json.dumps(obj, sort_keys=True).encode()
+        cid = "bafy" + sha256(data).hexdigest()
+        with self.lock:
+            self.objects[cid] = data
+        return cid
+
+    def cat(self, cid: str, **kwargs) -> bytes:
+        with self.lock:
+            return self.objects[cid]
+
+
+def to_rpc(value):
+    """
+    Encode eth-tester results as JSON-RPC values (hex quantities/data)
+    """
+    if value is None or isinstance(value, (bool, str)):
+        return value
+    if isinstance(value, int):
+        return hex(value)
+    if isinstance(value, (bytes, bytearray)):
+        return "0x" + bytes(value).hex()
+    if isinstance(value, Mapping):
+        return {key: to_rpc(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_rpc(item) for item in value]
+    return value
+
+
+class TesterRPC:
+    """
+    eth-tester chain served as an HTTP JSON-RPC node (batches included)
+    Requests are serialised, as eth-tester is not thread-safe
+    """
+    def __init__(self):
+        self.w3 = Web3(EthereumTesterProvider())
+        self.lock = Lock()
+        # sender -> {nonce: raw transaction} held back until gaps close
+        self.queued = {}
+        # Provider middlewares only, as a node sees raw JSON-RPC
+        self.make_request = self.w3.provider.request_func(
+            self.w3, NamedElementOnion([]))
+        self.server = None
+
+    def send_raw(self, rawtx: str) -> dict:
+        """
+        eth_sendRawTransaction with a node-like queue: eth-tester mines
+        instantly and rejects nonce gaps, whereas a node holds transactions
+        ahead of their senders nonce until the gap closes
+        Caller must hold self.lock
+        """
+        raw = HexBytes(rawtx)
+        typed = raw[0] <= 0x7f
+        nonce = big_endian_to_int(rlp.decode(raw[1:] if typed else raw)[
+            1 if typed else 0])
+        sender = Account.recover_transaction(raw)
+        if nonce > self.w3.eth.get_transaction_count(sender):
+            self.queued.setdefault(sender, {})[nonce] = rawtx
+            return {'result': keccak(raw)}
+        result = self.make_request("eth_sendRawTransaction", [rawtx])
+        queued = self.queued.get(sender, {})
+        while 'error' not in result and nonce + 1 in queued:
+            nonce += 1
+            self.make_request("eth_sendRawTransaction",
+                              [queued.pop(nonce)])
+        return result
+
+    def handle(self, request: dict) -> dict:
+        response = {'jsonrpc': "2.0", 'id': request.get('id')}
+        try:
+            with self.lock:
+                if request['method'] == "eth_sendRawTransaction":
+                    result = self.send_raw(request['params'][0])
+                else:
+                    result = self.make_request(request['method'],
+                                               request.get('params', []))
+                # eth-tester quotes a fixed gas price of 1 wei, below the
+                # base fee, so a node-like price covering it is quoted
+                if request['method'] == "eth_gasPrice":
+                    block = self.w3.eth.get_block("latest")
+                    result = {'result': 2 * block['base_fee_per_gas']}
+        except Exception as Error:
+            # Surfaced as reverts, as by a node
+            result = {'error': f"execution reverted: {Error}"}
+        if 'error' in result:
+            error = result['error']
+            response['error'] = error if isinstance(error, dict) else {
+                'code': -32000,
+                'message': str(error)
+            }
+        else:
+            response['result'] = to_rpc(result['result'])
+        return response
+
+    def transact(self, function: Callable, *args, **kwargs):
+        """
+        Run a web3 call against the chain directly, holding the lock
+        """
+        with self.lock:
+            return function(*args, **kwargs)
+
+    def serve(self) -> str:
+        """
+        Serve chain in a background thread, returns its URL
+        """
+        rpc = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:
+                payload = json.loads(
+                    self.rfile.read(int(self.headers['Content-Length'])))
+                if isinstance(payload, list):
+                    response = [rpc.handle(request) for request in payload]
+                else:
+                    response = rpc.handle(payload)
+                body = json.dumps(response).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        self.server = ThreadingHTTPServer((HOST, 0), Handler)
+        Thread(target=self.server.serve_forever, name="tester-rpc",
+               daemon=True).start()
+        return f"http://{HOST}:{self.server.server_address[1]}"
+
+
+def load_artifact(path: str) -> dict:
+    with open(path) as artifact:
+        return json.load(artifact)
+
+
+def deploy_artifact(rpc: "TesterRPC", artifact: dict, deployer: str,
+                    *args) -> str:
+    """
+    Deploy contract artifact, returns its address
+    """
+    factory = rpc.w3.eth.contract(abi=artifact['abi'],
+                                  bytecode=artifact['bytecode'])
+    tx_hash = rpc.transact(factory.constructor(*args).transact,
+                           {'from': deployer})
+    return rpc.transact(rpc.w3.eth.wait_for_transaction_receipt,
+                        tx_hash).contractAddress
+
+
+def install_abi_module(name: str, abi: list) -> None:
+    """
+    Provide a contract ABI module absent from the working tree
+    (ABI modules are generated at deploy time and not committed)
+    """
+    try:
+        __import__(f"methods.onchain.{name}")
+    except ImportError:
+        module = types.ModuleType(f"methods.onchain.{name}")
+        setattr(module, name, abi)
+        sys.modules[module.__name__] = module
+
+
+def percentile(latencies: List[float], fraction: float) -> float:
+    ordered = sorted(latencies)
+    return ordered[max(ceil(fraction * len(ordered)) - 1, 0)]
+
+
+async def drive(session: aiohttp.ClientSession, name: str,
+                make_request: Callable, count: int, concurrency: int) -> dict:
+    """
+    Issue count requests from concurrency workers, returns summary
+    """
+    latencies, errors = [], 0
+    indexes = iter(range(count))
+
+    async def worker() -> None:
+        nonlocal errors
+        for index in indexes:
+            start = perf_counter()
+            try:
+                async with make_request(session, index) as response:
+                    await response.read()
+                    failed = response.status >= 400
+            except aiohttp.ClientError:
+                failed = True
+            latencies.append(perf_counter() - start)
+            errors += failed
+
+    start = perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = perf_counter() - start
+    summary = {
+        'endpoint': name,
+        'requests': count,
+        'errors': errors,
+        'concurrency': concurrency,
+        'duration_s': round(elapsed, 4),
+        'rps': round(count / elapsed, 2) if elapsed else None,
+        'p50_ms': round(percentile(latencies, 0.5) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+        'mean_ms': round(sum(latencies) / len(latencies) * 1000, 2)
+    } if latencies else {'endpoint': name, 'requests': 0}
+    print(json.dumps(summary))
+    return summary
+
+
+def wait_for(predicate: Callable, timeout: float, what: str) -> None:
+    deadline = perf_counter() + timeout
+    while not predicate():
+        if perf_counter() > deadline:
+            raise TimeoutError(f"Timed out waiting for {what}")
+        sleep(0.2)
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"],
+                              capture_output=True,
+                              text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def boot(args, rpc: TesterRPC) -> tuple:
+    """
+    Deploy proxy, configure environment and import the API
+    """
+    proxy_artifact = load_artifact(args.proxy_artifact)
+    item_artifact = load_artifact(args.item_artifact)
+    deployer = rpc.w3.eth.accounts[0]
+    constructor_args = []
+    if 'bytecode' in item_artifact:
+        constructor_args.append(
+            deploy_artifact(rpc, item_artifact, deployer))
+    proxy_address = deploy_artifact(rpc, proxy_artifact, deployer,
+                                    *constructor_args)
+
+    workdir = tempfile.mkdtemp(prefix="ac-bench-")
+    os.environ.update({
+        'WEB3_URL': rpc.serve(),
+        'PROXY_ADDRESS': proxy_address,
+        'DATABASE_URL': args.database_url
+        or f"sqlite:///{workdir}/bench.db",
+        'IPFS_URL': "/ip4/127.0.0.1/tcp/5001",
+        'JWTKEY': token_hex(32),
+        'INGEST_IN_PROCESS': "true",
+        'INGEST_POLL_MAX': "0.5",
+        'METADATA_CACHE_DIR': f"{workdir}/metadata-cache"
+    })
+    fake_ipfs = FakeIPFS()
+    ipfshttpclient.connect = lambda *args, **kwargs: fake_ipfs
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    install_abi_module("ProxyContractABI", proxy_artifact['abi'])
+    install_abi_module("ItemContractABI", item_artifact['abi'])
+    import ac_http_api
+    return ac_http_api, rpc.w3.eth.contract(address=proxy_address,
+                                            abi=proxy_artifact['abi'])
+
+
+async def run_benchmark(args, proxy, rpc: TesterRPC, base_url: str,
+                        serve_started: Callable) -> List[dict]:
+    from methods.database import db_schemas
+    from methods.database.database import SessionLocal
+
+    await asyncio.get_running_loop().run_in_executor(
+        None, wait_for, serve_started, 30, "API startup")
+    count, concurrency = args.requests, args.concurrency
+    results = []
+    async with aiohttp.ClientSession(base_url) as session:
+        # Accounts: one operator (brand owner), one transfer receiver
+        users = {}
+        for role in ("operator", "receiver"):
+            username = f"bench-{role}-{token_hex(4)}"
+            async with session.post("/users/create",
+                                    json={
+                                        'username': username,
+                                        'email': f"{username}@bench.local",
+                                        'passkey': PASSKEY
+                                    }) as response:
+                response.raise_for_status()
+                users[role] = await response.json()
+        operator = users['operator']
+        with SessionLocal() as database:
+            database.query(db_schemas.User).filter(
+                db_schemas.User.id == operator['id']).update(
+                    {'type': "operator"})
+            database.commit()
+        deployer = rpc.transact(lambda: rpc.w3.eth.accounts[0])
+        rpc.transact(
+            rpc.w3.eth.send_transaction, {
+                'from': deployer,
+                'to': operator['publickey'],
+                'value': rpc.w3.toWei(1000, 'ether')
+            })
+        rpc.transact(proxy.functions[args.deploy_fn](
+            operator['publickey']).transact, {'from': deployer})
+
+        def operator_ingested() -> bool:
+            with SessionLocal() as database:
+                db_operator = database.query(db_schemas.Operator).filter(
+                    db_schemas.Operator.id == operator['id']).first()
+            return db_operator is not None
+
+        await asyncio.get_running_loop().run_in_executor(
+            None, wait_for, operator_ingested, 60, "brand deployment ingest")
+
+        login = {'username': operator['username'], 'password': PASSKEY}
+        async with session.post("/token", data=login) as response:
+            response.raise_for_status()
+            token = (await response.json())['access_token']
+        auth = {'Authorization': f"Bearer {token}"}
+
+        item = {
+            'name': "Benchmark Item",
+            'description': "Benchmark item token",
+            'image': "https://example.com/item.png",
+            'brand': "Benchmark",
+            'attributes': [{
+                'trait_type': "run",
+                'value': args.run_id
+            }]
+        }
+
+        def request_token(session, index):
+            return session.post("/token", data=login)
+
+        def create_item(session, index):
+            return session.post(
+                "/items/create",
+                params={'passkey': PASSKEY},
+                json=[dict(item, name=f"Benchmark Item {index}")],
+                headers=auth)
+
+        results.append(await drive(session, "/token", request_token, count,
+                                   concurrency))
+        results.append(await drive(session, "/items/create", create_item,
+                                   count, concurrency))
+
+        def minted_items() -> List[int]:
+            with SessionLocal() as database:
+                return [
+                    item_id for (item_id, ) in database.query(
+                        db_schemas.Owner.item_id).filter(
+                            db_schemas.Owner.owner == bytes(
+                                operator['publickey'], 'utf-8')).order_by(
+                                    db_schemas.Owner.item_id)
+                ]
+
+        await asyncio.get_running_loop().run_in_executor(
+            None, wait_for, lambda: len(minted_items()) >= count, 60,
+            "mint ingest")
+        item_ids = minted_items()
+
+        def get_item(session, index):
+            return session.get(
+                "/items/get",
+                params={'item_id': item_ids[index % len(item_ids)]})
+
+        def view_item_owner(session, index):
+            return session.get(
+                "/items/view/owner",
+                params={'item_id': item_ids[index % len(item_ids)]})
+
+        def transfer_item(session, index):
+            return session.post("/users/items/transfer",
+                                params={
+                                    'item_id': item_ids[index],
+                                    'receiver_attr':
+                                    users['receiver']['username'],
+                                    'passkey': PASSKEY
+                                },
+                                headers=auth)
+
+        results.append(await drive(session, "/items/get", get_item, count,
+                                   concurrency))
+        results.append(await drive(session, "/items/view/owner",
+                                   view_item_owner, count, concurrency))
+        results.append(await drive(session, "/users/items/transfer",
+                                   transfer_item, min(count, len(item_ids)),
+                                   concurrency))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--proxy-artifact",
+                        default=os.path.join(BENCH_CONTRACTS,
+                                             "BenchProxy.json"),
+                        help="Proxy contract JSON artifact (abi, bytecode)")
+    parser.add_argument("--item-artifact",
+                        default=os.path.join(BENCH_CONTRACTS,
+                                             "BenchItem.json"),
+                        help="Item contract JSON artifact (abi, optionally "
+                        "template bytecode)")
+    parser.add_argument("--deploy-fn", default="deployContract",
+                        help="Proxy function deploying a brand contract "
+                        "for an operator address")
+    parser.add_argument("--database-url",
+                        help="Database URL (default: temporary SQLite)")
+    parser.add_argument("--requests", type=int, default=200,
+                        help="Requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--output", help="Result JSON path")
+    args = parser.parse_args()
+    args.run_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+    rpc = TesterRPC()
+    api, proxy = boot(args, rpc)
+    server = uvicorn.Server(
+        uvicorn.Config(api.app, host=HOST, port=args.port,
+                       log_level="warning"))
+    Thread(target=server.run, name="api", daemon=True).start()
+    try:
+        results = asyncio.run(
+            run_benchmark(args, proxy, rpc, f"http://{HOST}:{args.port}",
+                          lambda: server.started))
+    finally:
+        server.should_exit = True
+
+    report = {
+        'run_id': args.run_id,
+        'revision': git_revision(),
+        'database': os.environ['DATABASE_URL'].split(":", 1)[0],
+        'requests': args.requests,
+        'concurrency': args.concurrency,
+        'results': results
+    }
+    output = args.output or f"benchmark-{args.run_id}.json"
+    with open(output, "w") as report_file:
+        json.dump(report, report_file, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+"""
+Authentichain Event Ingestion Worker
+Standalone proxy contract event log -> database population
+Run alongside the API (INGEST_IN_PROCESS="false", the default)
+"""
+import logging
+from os import getenv
+
+from methods.database.db_methods import load_db, populate_db
+from methods.metrics.metrics_methods import serve_metrics
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    if getenv('METRICS_PORT'):
+        serve_metrics(int(getenv('METRICS_PORT')))
+    load_db()
+    populate_db()
@@ -0,0 +1,110 @@
+"""
+In-Process Cache Objects
+"""
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+
+
+MISSING = object()  # Cache miss sentinel, None may be a cached value
+
+
+class LRUCache:
+    """
+    Bounded, thread-safe least-recently-used cache
+    Counts hits and misses
+    """
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.lock = Lock()
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        """
+        Get cached value, marking it as recently used
+        """
+        with self.lock:
+            value = self.entries.get(key, MISSING)
+            if value is MISSING:
+                self.misses += 1
+                return default
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value) -> None:
+        """
+        Cache value, evicting the least recently used entry when full
+        """
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, key) -> None:
+        """
+        Drop cached value
+        """
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def invalidate_where(self, predicate) -> None:
+        """
+        Drop all cached values whose key satisfies predicate
+        """
+        with self.lock:
+            for key in [key for key in self.entries if predicate(key)]:
+                del self.entries[key]
+
+    def clear(self) -> None:
+        """
+        Drop all cached values
+        """
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self) -> dict:
+        """
+        Cache size and hit/miss counters
+        """
+        return {
+            'size': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+
+class TTLCache(LRUCache):
+    """
+    Bounded LRU cache whose entries expire ttl seconds after being set
+    """
+    def __init__(self, maxsize: int = 1024, ttl: float = 60):
+        super().__init__(maxsize)
+        self.ttl = ttl
+
+    def get(self, key, default=None):
+        """
+        Get cached value unless expired
+        """
+        entry = super().get(key, MISSING)
+        if entry is MISSING:
+            return default
+        value, expiry = entry
+        if monotonic() >= expiry:
+            with self.lock:
+                # Counted as a hit by LRUCache.get, reclassified as a miss
+                self.hits -= 1
+                self.misses += 1
+                if self.entries.get(key) is entry:
+                    del self.entries[key]
+            return default
+        return value
+
+    def set(self, key, value) -> None:
+        """
+        Cache value for ttl seconds
+        """
+        super().set(key, (value, monotonic() + self.ttl))
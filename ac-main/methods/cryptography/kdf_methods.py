@@ -0,0 +1,79 @@
+"""
+Scrypt Password Hash/Verify Module
+Hashing runs on a bounded executor, off the API event loop
+"""
+from asyncio import get_running_loop
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from hashlib import scrypt
+from hmac import compare_digest
+from os import getenv, urandom
+
+from . import sha_methods
+
+
+KDF_PREFIX = b"scrypt"
+KDF_WORK_FACTOR = int(getenv('KDF_WORK_FACTOR', '14'))  # log2 of scrypt N
+KDF_BLOCK_SIZE = 8
+KDF_PARALLELISM = 1
+KDF_CONCURRENCY = int(getenv('KDF_CONCURRENCY', '2'))
+
+kdf_executor = ThreadPoolExecutor(max_workers=KDF_CONCURRENCY,
+                                  thread_name_prefix="kdf")
+
+
+def _derive(plaintext: str, salt: bytes, work_factor: int, block_size: int,
+            parallelism: int) -> bytes:
+    cost = 2**work_factor
+    return scrypt(bytes(plaintext, "utf-8"),
+                  salt=salt,
+                  n=cost,
+                  r=block_size,
+                  p=parallelism,
+                  maxmem=256 * cost * block_size * parallelism,
+                  dklen=32)
+
+
+def create_hash(plaintext: str) -> bytes:
+    """
+    Create salted scrypt hash of string
+    Format: scrypt$<log2 N>$<r>$<p>$<salt hex>$<hash hex>
+    """
+    salt = urandom(16)
+    derived = _derive(plaintext, salt, KDF_WORK_FACTOR, KDF_BLOCK_SIZE,
+                      KDF_PARALLELISM)
+    fields = (KDF_PREFIX, b"%d" % KDF_WORK_FACTOR, b"%d" % KDF_BLOCK_SIZE,
+              b"%d" % KDF_PARALLELISM, salt.hex().encode(),
+              derived.hex().encode())
+    return b"$".join(fields)
+
+
+def verify_hash(plaintext: str, hashed: bytes) -> bool:
+    """
+    Verifies hash of plaintext with an existing (scrypt or legacy) hash
+    """
+    if not hashed.startswith(KDF_PREFIX + b"$"):
+        return sha_methods.verify_hash(plaintext, hashed)
+    _, work_factor, block_size, parallelism, salt, derived = hashed.split(
+        b"$")
+    to_check = _derive(plaintext, bytes.fromhex(salt.decode()),
+                       int(work_factor), int(block_size), int(parallelism))
+    return compare_digest(to_check, bytes.fromhex(derived.decode()))
+
+
+def needs_rehash(hashed: bytes) -> bool:
+    """
+    Checks whether hash is legacy or below the configured work factor
+    """
+    if not hashed.startswith(KDF_PREFIX + b"$"):
+        return True
+    return int(hashed.split(b"$")[1]) < KDF_WORK_FACTOR
+
+
+async def run_kdf(function, *args, **kwargs):
+    """
+    Await a hashing function on the bounded KDF executor
+    """
+    loop = get_running_loop()
+    return await loop.run_in_executor(kdf_executor,
+                                      partial(function, *args, **kwargs))
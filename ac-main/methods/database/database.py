@@ -3,19 +3,116 @@ Database connectivity
 Using PostgreSQL
 """
 from os import getenv
+from threading import Lock
 
 import ipfshttpclient
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
+from ..metrics.metrics_methods import instrument_engine
+
+DB_POOL_SIZE = int(getenv('DB_POOL_SIZE', '10'))
+DB_MAX_OVERFLOW = int(getenv('DB_MAX_OVERFLOW', '20'))
+DB_POOL_PRE_PING = getenv('DB_POOL_PRE_PING', "true") == "true"
+DB_POOL_RECYCLE = int(getenv('DB_POOL_RECYCLE', '1800'))
+DB_STATEMENT_CACHE_SIZE = int(getenv('DB_STATEMENT_CACHE_SIZE', '256'))
+
+
+def engine_options(url: str, **pool_options) -> dict:
+    """
+    create_engine keyword arguments for database URL
+    SQLite (benchmarks, local runs) takes no pool sizing and shares
+    connections across the API's worker threads
+    """
+    if url.startswith("sqlite"):
+        return {'connect_args': {'check_same_thread': False}}
+    return pool_options
+
 
 # Connecting to database and creating a usage session
-engine = create_engine(getenv('DATABASE_URL'))
+DATABASE_URL = getenv('DATABASE_URL')
+engine = create_engine(
+    DATABASE_URL,
+    **engine_options(DATABASE_URL,
+                     pool_size=DB_POOL_SIZE,
+                     max_overflow=DB_MAX_OVERFLOW,
+                     pool_pre_ping=DB_POOL_PRE_PING,
+                     pool_recycle=DB_POOL_RECYCLE))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+instrument_engine(engine, "api")
+
+# Dedicated pool for the event ingestion worker
+ingest_engine = create_engine(
+    DATABASE_URL,
+    **engine_options(DATABASE_URL,
+                     pool_size=int(getenv('INGEST_POOL_SIZE', '2')),
+                     max_overflow=0))
+IngestSessionLocal = sessionmaker(autocommit=False,
+                                  autoflush=False,
+                                  bind=ingest_engine)
+instrument_engine(ingest_engine, "ingest")
+
+# Asynchronous sessions for event loop endpoints, engine created on first use
+AsyncSessionLocal = sessionmaker(class_=AsyncSession,
+                                 autoflush=False,
+                                 expire_on_commit=False)
+async_engine = None
+
+
+def get_async_engine():
+    """
+    Asynchronous engine (asyncpg, or aiosqlite for SQLite URLs)
+    Prepared statements are cached per connection
+    """
+    global async_engine
+    if async_engine is None:
+        url = make_url(DATABASE_URL)
+        if url.get_backend_name() == "sqlite":
+            url = url.set(drivername="sqlite+aiosqlite")
+        else:
+            url = url.set(drivername="postgresql+asyncpg").update_query_dict({
+                'prepared_statement_cache_size':
+                str(DB_STATEMENT_CACHE_SIZE)
+            })
+        async_engine = create_async_engine(
+            url,
+            **engine_options(str(url),
+                             pool_size=DB_POOL_SIZE,
+                             max_overflow=DB_MAX_OVERFLOW,
+                             pool_pre_ping=DB_POOL_PRE_PING,
+                             pool_recycle=DB_POOL_RECYCLE))
+        instrument_engine(async_engine.sync_engine, "async")
+        AsyncSessionLocal.configure(bind=async_engine)
+    return async_engine
+
+
+async def dispose_async_engine() -> None:
+    """
+    Close pooled asynchronous connections
+    """
+    global async_engine
+    if async_engine is not None:
+        await async_engine.dispose()
+        async_engine = None
 
 # Base class declaration
 Base = declarative_base()
 
-# IPFS connection
-ipfs = ipfshttpclient.connect(getenv('IPFS_URL'))
+# IPFS connection, opened on first use
+ipfs_lock = Lock()
+ipfs = None
+
+
+def get_ipfs():
+    """
+    IPFS API client
+    """
+    global ipfs
+    if ipfs is None:
+        with ipfs_lock:
+            if ipfs is None:
+                ipfs = ipfshttpclient.connect(getenv('IPFS_URL'))
+    return ipfs
@@ -1,53 +1,256 @@
 """
 Smart contract event log --> database population module
 """
-from ..db_schemas import Item, Operator, User
+from os import getenv
+from typing import Dict, List, Optional
+
+from eth_utils import encode_hex, event_abi_to_log_topic
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, load_only
+
+from ..items.item_cache import metadata_cache
+from ..metrics.metrics_methods import record_ingest_progress
+from ..onchain.ItemContractABI import ItemContractABI
+from ..onchain.onchain_objects import contract_registry
+from .db_schemas import BlockCheckpoint, Item, Operator, Owner, User
+
+
+INGEST_CHUNK_SIZE = int(getenv('INGEST_CHUNK_SIZE', '2000'))
+INGEST_CONFIRMATIONS = int(getenv('INGEST_CONFIRMATIONS', '0'))
+INGEST_START_BLOCK = getenv('INGEST_START_BLOCK')
+
+
+def dialect_insert(db: Session, model):
+    """
+    INSERT construct supporting ON CONFLICT for the bound database dialect
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        return sqlite_insert(model)
+    return postgresql_insert(model)
+
+
+def load_checkpoint(db: Session, name: str) -> Optional[int]:
+    """
+    Last fully processed block of named filter
+    """
+    checkpoint = db.query(BlockCheckpoint).filter(
+        BlockCheckpoint.name == name).first()
+    return checkpoint.block if checkpoint else None
+
+
+def save_checkpoint(db: Session, name: str, block: int) -> None:
+    """
+    Stage checkpoint of named filter (committed by caller)
+    """
+    db.merge(BlockCheckpoint(name=name, block=block))
 
 
 class TokenFilters:
     """
     Smart contract event log filter -
-    Checks for mint, burn and deploy events
+    Checks for mint, burn and deploy events on the proxy contract
+    and item transfer events on all brand contracts
     Stores result in postgres instance
+    Resumes from the last processed block stored in block_checkpoints
     """
-    def __init__(self, db, contract):
+    def __init__(self, db, contract, name: str = "proxy"):
         self.db = db
-        self.mintfilter = contract.events.Mint.createFilter(fromBlock="latest")
-        self.burnfilter = contract.events.Burn.createFilter(fromBlock="latest")
-        self.deployfilter = contract.events.Deploy.createFilter(
-            fromBlock="latest")
+        self.w3 = contract.web3
+        self.address = contract.address
+        self.name = name
+        self.events = {}
+        for event in (contract.events.Mint(), contract.events.Burn(),
+                      contract.events.Deploy()):
+            self.events[event_abi_to_log_topic(event.abi)] = event
+        # Item transfers are emitted by each brands item contract
+        self.transfer_event = self.w3.eth.contract(
+            abi=ItemContractABI).events.ItemTransfer()
+        self.transfer_topic = encode_hex(
+            event_abi_to_log_topic(self.transfer_event.abi))
+        self.checkpoint = load_checkpoint(db, name)
+        if self.checkpoint is None:
+            # First run starts from INGEST_START_BLOCK, or the chain head
+            if INGEST_START_BLOCK:
+                self.checkpoint = int(INGEST_START_BLOCK) - 1
+            else:
+                self.checkpoint = self.head()
+            save_checkpoint(db, name, self.checkpoint)
+            db.commit()
 
-    def filter(self) -> bool:
+    def head(self) -> int:
         """
-        Filter function
+        Latest block considered final
+        """
+        return self.w3.eth.block_number - INGEST_CONFIRMATIONS
+
+    def get_events(self, from_block: int,
+                   to_block: int) -> Dict[str, List[dict]]:
+        """
+        Fetch and decode all filtered events within block range
         """
-        mints = self.mintfilter.get_new_entries()
-        burns = self.burnfilter.get_new_entries()
-        deploys = self.deployfilter.get_new_entries()
+        logs = self.w3.eth.get_logs({
+            'address': self.address,
+            'fromBlock': from_block,
+            'toBlock': to_block,
+            'topics': [[encode_hex(topic) for topic in self.events]]
+        })
+        events = {'Mint': [], 'Burn': [], 'Deploy': [], 'ItemTransfer': []}
+        for log in logs:
+            event = self.events[bytes(log['topics'][0])]
+            events[event.event_name].append(event.processLog(log))
+
+        # Brand contracts known so far, plus those deployed within range
+        brand_contracts = {
+            contract.decode()
+            for (contract, ) in self.db.query(Operator.contract)
+        }
+        brand_contracts.update(deploy['args']['contadr']
+                               for deploy in events['Deploy'])
+        if brand_contracts:
+            transfer_logs = self.w3.eth.get_logs({
+                'address': sorted(brand_contracts),
+                'fromBlock': from_block,
+                'toBlock': to_block,
+                'topics': [self.transfer_topic]
+            })
+            events['ItemTransfer'] = [
+                self.transfer_event.processLog(log) for log in transfer_logs
+            ]
+        return events
+
+    def apply(self, events: Dict[str, List[dict]]) -> None:
+        """
+        Stage decoded events as bulk statements (committed by caller)
+        Replays are idempotent: mints, operators and owners are upserted
+        and burns are set-based deletes
+        """
+        mints = events['Mint']
+        burns = events['Burn']
+        deploys = events['Deploy']
+        transfers = events['ItemTransfer']
+
+        # Operators first, minted items are owned by their brands operator
+        if deploys:
+            operators = {
+                bytes(deploy['args']['operator'], 'utf-8'):
+                bytes(deploy['args']['contadr'], 'utf-8')
+                for deploy in deploys
+            }
+            db_users = self.db.query(User).filter(
+                User.publickey.in_(operators)).options(
+                    load_only('id', 'publickey')).all()
+            if db_users:
+                upsert = dialect_insert(self.db, Operator).values([{
+                    'id': db_user.id,
+                    'contract': operators[db_user.publickey]
+                } for db_user in db_users])
+                self.db.execute(
+                    upsert.on_conflict_do_update(
+                        index_elements=['id'],
+                        set_={'contract': upsert.excluded.contract}))
 
         if mints:
-            for mint in mints:
-                item_id = mint['args']['itemid']
-                contadr = mint['args']['contadr']
-                db_item = Item(id=item_id, brand=contadr)
-                self.db.add(db_item)
-                self.db.commit()
+            self.db.execute(
+                dialect_insert(self.db, Item).values([{
+                    'id': mint['args']['itemid'],
+                    'contract': bytes(mint['args']['contadr'], 'utf-8')
+                } for mint in mints]).on_conflict_do_nothing(
+                    index_elements=['id']))
+            contracts = {
+                bytes(mint['args']['contadr'], 'utf-8')
+                for mint in mints
+            }
+            brand_operators = dict(
+                self.db.query(Operator.contract, User.publickey).join(
+                    User, User.id == Operator.id).filter(
+                        Operator.contract.in_(contracts)))
+            self.set_owners({
+                mint['args']['itemid']:
+                (mint['args']['contadr'],
+                 brand_operators.get(bytes(mint['args']['contadr'], 'utf-8')))
+                for mint in mints
+            })
+
+        if transfers:
+            # Logs are ordered, so the last transfer of an item wins
+            self.set_owners({
+                transfer['args']['itemid']:
+                (transfer['address'], bytes(transfer['args']['to'], 'utf-8'))
+                for transfer in transfers
+            })
 
         if burns:
-            for burn in burns:
-                item_id = burn['args']['itemid']
-                contadr = burn['args']['contadr']
-                self.db.query(Item).filter(Item.id == item_id).delete()
-                self.db.commit()
+            burned_ids = [burn['args']['itemid'] for burn in burns]
+            self.db.query(Item).filter(Item.id.in_(burned_ids)).delete(
+                synchronize_session=False)
+            self.db.query(Owner).filter(Owner.item_id.in_(burned_ids)).delete(
+                synchronize_session=False)
 
-        if deploys:
-            for deploy in deploys:
-                operator = deploy['args']['operator']
-                contadr = deploy['args']['contadr']
-                db_user = self.db.query(User).filter(
-                    User.publickey == operator).first()
-                db_operator = Operator(id=db_user.id, contract=contadr)
-                self.db.add(db_operator)
+    def set_owners(self, owners: Dict[int, tuple]) -> None:
+        """
+        Upsert ownership index rows from {item_id: (contract, owner)}
+        """
+        owners = {
+            item_id: (contract, owner)
+            for item_id, (contract, owner) in owners.items() if owner
+        }
+        if not owners:
+            return
+        upsert = dialect_insert(self.db, Owner).values([{
+            'item_id': item_id,
+            'contract': bytes(contract, 'utf-8'),
+            'owner': owner
+        } for item_id, (contract, owner) in owners.items()])
+        updated = {
+            'contract': upsert.excluded.contract,
+            'owner': upsert.excluded.owner
+        }
+        self.db.execute(
+            upsert.on_conflict_do_update(index_elements=['item_id'],
+                                         set_=updated))
+
+    def invalidate(self, events: Dict[str, List[dict]]) -> None:
+        """
+        Drop cached state made stale by committed events
+        Only reaches caches of the ingesting process: with a standalone
+        ingester (the default) the API process keeps its
+        in-memory entries, which is safe as reads of burned items are
+        rejected by the items table lookup before any cache is consulted
+        """
+        for burn in events['Burn']:
+            contract_registry.invalidate(burn['args']['contadr'])
+            metadata_cache.invalidate(burn['args']['itemid'])
+        for deploy in events['Deploy']:
+            contract_registry.invalidate(deploy['args']['contadr'])
+
+    def filter(self) -> int:
+        """
+        Filter function
+        Processes every block since the checkpoint in chunked get_logs
+        ranges - backfilling any downtime gap on the first call, then
+        tailing new blocks on subsequent calls
+        Returns number of events ingested
+        """
+        ingested = 0
+        head = self.head()
+        record_ingest_progress(self.name, head + INGEST_CONFIRMATIONS,
+                               self.checkpoint)
+        while self.checkpoint < head:
+            to_block = min(self.checkpoint + INGEST_CHUNK_SIZE, head)
+            events = self.get_events(self.checkpoint + 1, to_block)
+            # Events and checkpoint of each range share one transaction
+            try:
+                self.apply(events)
+                save_checkpoint(self.db, self.name, to_block)
                 self.db.commit()
+            except Exception:
+                self.db.rollback()
+                raise
+            self.checkpoint = to_block
+            record_ingest_progress(self.name, head + INGEST_CONFIRMATIONS,
+                                   self.checkpoint)
+            ingested += sum(len(logs) for logs in events.values())
+            self.invalidate(events)
 
-        return True
+        return ingested
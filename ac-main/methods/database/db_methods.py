@@ -1,31 +1,57 @@
 """
 Database methods
 """
-from asyncio import sleep
+from typing import AsyncIterator
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from ..onchain.onchain_config import proxy_contract
-from .database import Base, SessionLocal, engine
+from ..onchain.onchain_config import get_proxy_contract
+from ..onchain.onchain_methods import warm_contract_registry
+from .database import (
+    AsyncSessionLocal,
+    Base,
+    IngestSessionLocal,
+    SessionLocal,
+    engine,
+    get_async_engine,
+)
 from .db_filter import TokenFilters
+from .db_ingest import IngestWorker
+from .db_migrations import migrate_db
 
 
 def load_db() -> bool:
     """
-    Creates database tables
+    Creates database tables and applies migrations
     """
     Base.metadata.create_all(bind=engine)
+    migrate_db(engine)
     return True
 
 
-async def populate_db() -> None:
+def build_ingest_worker() -> IngestWorker:
+    """
+    Proxy smart contract event log filter -> database population worker
+    """
+    return IngestWorker(
+        lambda: TokenFilters(IngestSessionLocal(), get_proxy_contract()))
+
+
+def populate_db() -> None:
     """
     Proxy smart contract event log filter -> database population
+    Blocks, intended for dedicated ingestion processes
     """
-    itemfilter = TokenFilters(SessionLocal(), proxy_contract)
-    while True:
-        itemfilter.filter()
-        await sleep(5)
+    build_ingest_worker().run()
+
+
+def warm_caches() -> None:
+    """
+    Preloads in-process caches from the database
+    """
+    with SessionLocal() as database:
+        warm_contract_registry(database)
 
 
 def get_db() -> Session:
@@ -37,3 +63,12 @@ def get_db() -> Session:
         yield db_session
     finally:
         db_session.close()
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """
+    Asynchronous database context manager
+    """
+    get_async_engine()
+    async with AsyncSessionLocal() as db_session:
+        yield db_session
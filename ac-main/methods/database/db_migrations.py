@@ -0,0 +1,34 @@
+"""
+Database migrations
+create_all only creates missing tables, so indexes added to existing
+tables are created here, idempotently, on every start
+"""
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS = (
+    # Case-insensitive user lookups by username/email
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_users_username_lower "
+    "ON users (lower(username))",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_users_email_lower "
+    "ON users (lower(email))",
+)
+
+
+def migrate_db(engine) -> None:
+    """
+    Apply migrations, each in its own transaction
+    A failing migration (e.g. usernames differing only by case) is
+    logged and skipped, leaving the affected lookups unindexed
+    """
+    for migration in MIGRATIONS:
+        try:
+            with engine.begin() as connection:
+                connection.execute(text(migration))
+        except SQLAlchemyError:
+            logger.exception("Migration failed: %s", migration)
@@ -3,7 +3,16 @@ Database schemas
 """
 import enum
 
-from sqlalchemy import Column, Enum, Integer, String
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    Enum,
+    Index,
+    Integer,
+    String,
+    Text,
+    func,
+)
 from sqlalchemy.types import LargeBinary
 
 from .database import Base
@@ -29,6 +38,11 @@ class User(Base):
     username = Column(String, unique=True, nullable=True)
     email = Column(String, unique=True, nullable=True)
     type = Column(Enum(AccountType), server_default="user")
+    # Case-insensitive lookups by username/email
+    __table_args__ = (
+        Index("ix_users_username_lower", func.lower(username), unique=True),
+        Index("ix_users_email_lower", func.lower(email), unique=True),
+    )
 
 
 class Operator(Base):
@@ -47,3 +61,34 @@ class Item(Base):
     __tablename__ = "items"
     id = Column(Integer, primary_key=True, index=True)
     contract = Column(LargeBinary, index=True)
+
+
+class ItemMetadata(Base):
+    """
+    Item Metadata Cache Table
+    """
+    __tablename__ = "item_metadata"
+    item_id = Column(Integer, primary_key=True, index=True)
+    cid = Column(String, index=True)
+    content = Column(Text)
+
+
+class BlockCheckpoint(Base):
+    """
+    Event Ingestion Checkpoint Table
+    Last fully processed block per event filter
+    """
+    __tablename__ = "block_checkpoints"
+    name = Column(String, primary_key=True)
+    block = Column(BigInteger)
+
+
+class Owner(Base):
+    """
+    Item Ownership Index Table
+    Maintained from mint, transfer and burn events
+    """
+    __tablename__ = "owners"
+    item_id = Column(Integer, primary_key=True, index=True)
+    contract = Column(LargeBinary, index=True)
+    owner = Column(LargeBinary, index=True)
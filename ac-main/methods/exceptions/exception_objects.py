@@ -64,3 +64,32 @@ class CredentialError(Exception):
     def __init__(self, message="Credential Exception"):
         self.message = message
         super().__init__(self.message)
+
+
+class MetadataFetchError(Exception):
+    """
+    Exception raised upon failed or timed out item metadata retrieval
+    """
+    def __init__(self, message="Item metadata unavailable"):
+        self.message = message
+        super().__init__(self.message)
+
+
+class SignerSessionError(Exception):
+    """
+    Exception raised upon unknown, expired or foreign signer sessions
+    """
+    def __init__(self, message="Signer session expired or invalid"):
+        self.message = message
+        super().__init__(self.message)
+
+
+class CodeRenderError(Exception):
+    """
+    Exception raised upon a label code that cannot be rendered
+    (e.g. data exceeding the capacity of its code type)
+    """
+    def __init__(self, index: int, message="Code could not be rendered"):
+        self.index = index
+        self.message = message
+        super().__init__(self.message)
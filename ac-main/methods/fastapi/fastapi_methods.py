@@ -4,15 +4,29 @@ from typing import Optional
 
 from fastapi import Depends
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
 
+from ..caching.cache_objects import TTLCache
 from ..database import db_schemas
-from ..database.db_methods import get_db
+from ..database.db_methods import get_async_db
 from ..exceptions.exception_objects import CredentialError
 from ..fastapi.fastapi_config import oauth2_scheme
+from ..metrics.metrics_methods import register_cache
 
 
 JWTKEY = getenv('JWTKEY')
+JWT_EXPIRY = timedelta(minutes=30)
+
+# Authenticated user rows, cached no longer than a JWT remains valid
+PRINCIPAL_COLUMNS = ('id', 'publickey', 'accesskey', 'username', 'email',
+                     'type')
+principal_cache = TTLCache(
+    maxsize=int(getenv('PRINCIPAL_CACHE_SIZE', '4096')),
+    ttl=min(float(getenv('PRINCIPAL_CACHE_TTL', '60')),
+            JWT_EXPIRY.total_seconds()))
+register_cache("principals", principal_cache)
 
 
 # API Functions
@@ -24,7 +38,7 @@ def create_jwt(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(minutes=30)
+        expire = datetime.utcnow() + JWT_EXPIRY
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(to_encode, JWTKEY, algorithm="HS256")
     return encoded_jwt
@@ -44,14 +58,36 @@ def jwt_decoder(token: str) -> str:
     return user_id
 
 
-def get_current_user(database: Session = Depends(get_db),
-                     token: str = Depends(oauth2_scheme)) -> db_schemas.User:
+def invalidate_principal(user_id: str) -> None:
+    """
+    Drop cached principal of user
+    """
+    principal_cache.invalidate(user_id)
+
+
+@event.listens_for(db_schemas.User, "after_update")
+@event.listens_for(db_schemas.User, "after_delete")
+def _user_changed(mapper, connection, target: db_schemas.User) -> None:
+    invalidate_principal(target.id)
+
+
+async def get_current_user(
+        database: AsyncSession = Depends(get_async_db),
+        token: str = Depends(oauth2_scheme)) -> db_schemas.User:
     """
     Obtains details of currently logged in user
+    Served from the principal cache where possible
     """
     user_id = jwt_decoder(token)
-    db_user = database.query(
-        db_schemas.User).filter(db_schemas.User.id == user_id).first()
+    db_user = principal_cache.get(user_id)
+    if db_user is not None:
+        return db_user
+    db_user = (await database.execute(
+        select(db_schemas.User).where(db_schemas.User.id == user_id).options(
+            load_only(*PRINCIPAL_COLUMNS)))).scalars().first()
     if db_user is None:
         raise CredentialError
+    # Detached so the cached principal outlives the request session
+    database.expunge(db_user)
+    principal_cache.set(user_id, db_user)
     return db_user
@@ -0,0 +1,182 @@
+"""
+Item Token Metadata Cache
+IPFS metadata is immutable, so cached entries are only
+invalidated once their item token is burned
+"""
+import json
+import logging
+from os import fdopen, getenv, makedirs, path, remove, replace
+from tempfile import mkstemp
+from typing import Optional, Tuple
+
+from ..caching.cache_objects import LRUCache
+from ..database import db_schemas
+from ..database.database import SessionLocal
+from ..metrics.metrics_methods import register_cache
+
+
+logger = logging.getLogger(__name__)
+
+
+def uri_cid(uri: str) -> str:
+    """
+    Extract CID from an IPFS gateway URI
+    """
+    return uri.rsplit("/ipfs/", 1)[-1].strip("/")
+
+
+class DiskMetadataStore:
+    """
+    Persistent metadata tier -
+    One JSON document per item token in a local directory
+    """
+    def __init__(self, directory: str):
+        self.directory = directory
+        makedirs(directory, exist_ok=True)
+
+    def _path(self, item_id: int) -> str:
+        return path.join(self.directory, f"{item_id}.json")
+
+    def get(self, item_id: int) -> Optional[Tuple[str, dict]]:
+        try:
+            with open(self._path(item_id)) as entry:
+                stored = json.load(entry)
+        except (OSError, ValueError):
+            return None
+        return stored['cid'], stored['metadata']
+
+    def set(self, item_id: int, cid: str, metadata: dict) -> None:
+        # Written to a unique temporary file first, so readers never see
+        # partial JSON and concurrent writers never share a file
+        handle, temp_path = mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with fdopen(handle, "w") as entry:
+                json.dump({'cid': cid, 'metadata': metadata}, entry)
+            replace(temp_path, self._path(item_id))
+        except BaseException:
+            remove(temp_path)
+            raise
+
+    def invalidate(self, item_id: int) -> None:
+        try:
+            remove(self._path(item_id))
+        except FileNotFoundError:
+            pass
+
+
+class DatabaseMetadataStore:
+    """
+    Persistent metadata tier -
+    Stored in the item_metadata table
+    """
+    def __init__(self, session_factory):
+        self.session_factory = session_factory
+
+    def get(self, item_id: int) -> Optional[Tuple[str, dict]]:
+        with self.session_factory() as database:
+            stored = database.query(db_schemas.ItemMetadata).filter(
+                db_schemas.ItemMetadata.item_id == item_id).first()
+            if stored is None:
+                return None
+            return stored.cid, json.loads(stored.content)
+
+    def set(self, item_id: int, cid: str, metadata: dict) -> None:
+        with self.session_factory() as database:
+            database.merge(
+                db_schemas.ItemMetadata(item_id=item_id,
+                                        cid=cid,
+                                        content=json.dumps(metadata)))
+            database.commit()
+
+    def invalidate(self, item_id: int) -> None:
+        with self.session_factory() as database:
+            database.query(db_schemas.ItemMetadata).filter(
+                db_schemas.ItemMetadata.item_id == item_id).delete()
+            database.commit()
+
+
+class MetadataCache:
+    """
+    Two-tier item metadata cache -
+    In-process LRU in front of an optional persistent store,
+    entries keyed by item ID and carrying their metadata CID
+    """
+    def __init__(self, maxsize: int = 4096, store=None):
+        self.memory = LRUCache(maxsize)
+        self.store = store
+        self.store_hits = 0
+        self.store_misses = 0
+
+    def get(self, item_id: int) -> Optional[Tuple[str, dict]]:
+        """
+        Get (cid, metadata) of item token
+        """
+        entry = self.memory.get(item_id)
+        if entry is not None or self.store is None:
+            return entry
+        try:
+            entry = self.store.get(item_id)
+        except Exception:
+            # Store failures degrade to a miss, never failing the read
+            logger.exception("Metadata store read failed")
+            entry = None
+        if entry is None:
+            self.store_misses += 1
+            return None
+        self.store_hits += 1
+        self.memory.set(item_id, entry)
+        return entry
+
+    def set(self, item_id: int, cid: str, metadata: dict) -> None:
+        """
+        Cache metadata of item token in all tiers
+        """
+        self.memory.set(item_id, (cid, metadata))
+        if self.store is not None:
+            try:
+                self.store.set(item_id, cid, metadata)
+            except Exception:
+                logger.exception("Metadata store write failed")
+
+    def invalidate(self, item_id: int) -> None:
+        """
+        Drop metadata of (burned) item token from all tiers
+        """
+        self.memory.invalidate(item_id)
+        if self.store is None:
+            return
+        try:
+            self.store.invalidate(item_id)
+        except Exception:
+            logger.exception("Metadata store invalidation failed")
+
+    def stats(self) -> dict:
+        """
+        Per-tier hit/miss counters
+        """
+        return {
+            'memory': self.memory.stats(),
+            'store': {
+                'hits': self.store_hits,
+                'misses': self.store_misses
+            }
+        }
+
+
+def build_metadata_store():
+    """
+    Persistent tier selected by METADATA_CACHE_STORE (disk/database)
+    """
+    store_type = getenv('METADATA_CACHE_STORE')
+    if store_type == "disk":
+        return DiskMetadataStore(
+            getenv('METADATA_CACHE_DIR', "./metadata-cache"))
+    if store_type == "database":
+        return DatabaseMetadataStore(SessionLocal)
+    return None
+
+
+metadata_cache = MetadataCache(
+    maxsize=int(getenv('METADATA_CACHE_SIZE', '4096')),
+    store=build_metadata_store())
+register_cache("metadata", metadata_cache)
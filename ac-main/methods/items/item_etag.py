@@ -0,0 +1,68 @@
+"""
+Item Token HTTP Cache Validators
+ETags derive from the state the response body is built from:
+    - item: metadata CID (immutable until burned)
+    - owner/claimability: the value just read from the contract, so a
+      304 only saves the body (and owner lookup), never serves stale state
+"""
+from hashlib import sha256
+from os import getenv
+from typing import Any, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database.db_schemas import Item, ItemMetadata
+from .item_cache import metadata_cache
+
+
+ITEM_CACHE_MAX_AGE = int(getenv('ITEM_CACHE_MAX_AGE', '5'))
+
+
+def value_etag(view: str, item_id: int, value: Any) -> str:
+    """
+    Strong ETag of an item token view derived from its marker value
+    """
+    digest = sha256(f"{view}:{item_id}:{value}".encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+async def item_etag(database: AsyncSession, item_id: int) -> Optional[str]:
+    """
+    Strong ETag of an item token
+    None for unknown items, or while the metadata CID is not yet cached
+    """
+    row = (await database.execute(
+        select(Item.id, ItemMetadata.cid).outerjoin(
+            ItemMetadata, ItemMetadata.item_id == Item.id).where(
+                Item.id == item_id))).first()
+    if row is None:
+        return None
+    cached = metadata_cache.memory.get(item_id)
+    cid = row.cid or (cached[0] if cached is not None else None)
+    if cid is None:
+        return None
+    return value_etag("item", item_id, cid)
+
+
+def etag_matches(if_none_match: Optional[str], etag: Optional[str]) -> bool:
+    """
+    If-None-Match check (weak comparison, as required for GET)
+    An ETag is only derived for existing items, so "*" never matches
+    a missing representation
+    """
+    if not if_none_match or etag is None:
+        return False
+    tags = {tag.strip() for tag in if_none_match.split(",")}
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+def cache_headers(etag: Optional[str], private: bool = False) -> dict:
+    """
+    Cache-Control (and ETag) response headers of an item token view
+    """
+    scope = "private" if private else "public"
+    headers = {'Cache-Control': f"{scope}, max-age={ITEM_CACHE_MAX_AGE}"}
+    if etag is not None:
+        headers['ETag'] = etag
+    return headers
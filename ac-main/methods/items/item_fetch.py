@@ -0,0 +1,106 @@
+"""
+Item Token Metadata Fetching
+Bounded, timeout-enforcing IPFS reads
+"""
+import json
+import logging
+from os import getenv
+from threading import BoundedSemaphore
+from time import perf_counter
+from typing import Callable, Optional
+
+from ipfshttpclient.exceptions import Error as IPFSError
+from requests import RequestException, Session
+from requests.adapters import HTTPAdapter
+
+from ..database.database import get_ipfs
+from ..exceptions.exception_objects import MetadataFetchError
+from ..metrics.metrics_methods import ipfs_fetch_duration
+from .item_cache import uri_cid
+
+
+logger = logging.getLogger(__name__)
+
+IPFS_GATEWAY = getenv('IPFS_GATEWAY', "http://127.0.0.1:8080").rstrip("/")
+
+
+class MetadataFetcher:
+    """
+    IPFS metadata fetcher -
+    Reads through the connected IPFS client by CID, falling back to a
+    pooled keep-alive gateway session; at most `concurrency` fetches
+    run at once and every fetch is bounded by `timeout` seconds
+    """
+    def __init__(self,
+                 gateway: str,
+                 get_ipfs: Optional[Callable] = None,
+                 timeout: float = 5,
+                 concurrency: int = 16):
+        self.gateway = gateway
+        self.get_ipfs = get_ipfs
+        self.timeout = timeout
+        self.concurrency = concurrency
+        self.slots = BoundedSemaphore(concurrency)
+        self.session = Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _cat(self, cid: str) -> dict:
+        """
+        Read metadata through the IPFS API
+        """
+        return json.loads(self.get_ipfs().cat(cid, timeout=self.timeout))
+
+    def _gateway(self, cid: str) -> dict:
+        """
+        Read metadata through the IPFS HTTP gateway
+        """
+        response = self.session.get(f"{self.gateway}/ipfs/{cid}",
+                                    timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def _timed(self, source: str, read, cid: str) -> dict:
+        """
+        Read metadata, observing latency by source and outcome
+        """
+        start, outcome = perf_counter(), "error"
+        try:
+            metadata = read(cid)
+            outcome = "ok"
+            return metadata
+        finally:
+            ipfs_fetch_duration.observe(perf_counter() - start, source,
+                                        outcome)
+
+    def fetch(self, uri: str) -> dict:
+        """
+        Fetch JSON metadata referenced by an IPFS URI
+        """
+        cid = uri_cid(uri)
+        # Waiting callers are turned away rather than queueing indefinitely
+        if not self.slots.acquire(timeout=self.timeout):
+            raise MetadataFetchError("Metadata fetch capacity exhausted")
+        try:
+            if self.get_ipfs is not None:
+                try:
+                    return self._timed("api", self._cat, cid)
+                except (IPFSError, ValueError) as Error:
+                    logger.warning(
+                        "IPFS API read of %s failed, using gateway: %s", cid,
+                        Error)
+            try:
+                return self._timed("gateway", self._gateway, cid)
+            except (RequestException, ValueError):
+                raise MetadataFetchError
+        finally:
+            self.slots.release()
+
+
+metadata_fetcher = MetadataFetcher(
+    IPFS_GATEWAY,
+    get_ipfs=get_ipfs
+    if getenv('IPFS_READ_THROUGH', "true") == "true" else None,
+    timeout=float(getenv('IPFS_FETCH_TIMEOUT', '5')),
+    concurrency=int(getenv('IPFS_FETCH_CONCURRENCY', '16')))
@@ -2,41 +2,144 @@
 Item Token Methods/Functions
 """
 import json
-from typing import List
-from urllib.request import urlopen
+from concurrent.futures import ThreadPoolExecutor
+from os import getenv
+from typing import Dict, List, Tuple
 
-from eth_account import Account
 from sqlalchemy.orm import Session, load_only
 from web3 import exceptions
+from web3.contract import ContractFunction
 
-from ..cryptography.aes_methods import aes_decrypt
 from ..database import db_schemas
 from ..exceptions.exception_handlers import OnChainExceptionHandler
-from ..exceptions.exception_objects import CredentialError, OwnershipError
-from ..onchain.onchain_methods import buildtx
+from ..exceptions.exception_objects import MetadataFetchError, OwnershipError
+from ..onchain.ItemContractABI import ItemContractABI
+from ..onchain.onchain_config import gas_oracle, nonce_manager
+from ..onchain.onchain_methods import (
+    batch_call,
+    batch_request,
+    encode_call,
+    load_sender,
+    sendtx,
+)
 from ..onchain.onchain_objects import ProxyTXReqs, TXReqs
-from ..users.user_methods import get_user_publickey
+from ..onchain.onchain_receipts import receipt_tracker
+from ..users.user_methods import get_user_publickey, get_user_publickeys
 from . import item_objects
+from .item_cache import metadata_cache, uri_cid
+from .item_fetch import IPFS_GATEWAY, metadata_fetcher
+
+
+IPFS_UPLOAD_CONCURRENCY = int(getenv('IPFS_UPLOAD_CONCURRENCY', '8'))
+BATCH_GAS_MARGIN = 1.2
+
+
+def dispatch_batch(w3, sender, txs: List[Tuple[int, ContractFunction, dict]],
+                   results: List[dict]) -> None:
+    """
+    Sign and send contract transactions as a single JSON-RPC batch
+    Nonces are reserved consecutively, per-transaction hashes and
+    failures are recorded in results[index]
+    """
+    nonce = nonce_manager.reserve(sender.address, len(txs))
+    try:
+        signed_txs = []
+        for offset, (index, function, txdeps) in enumerate(txs):
+            rawtx = function.buildTransaction(
+                dict(txdeps, nonce=nonce + offset))
+            signed_txs.append(
+                (index, sender.signTransaction(rawtx).rawTransaction.hex()))
+
+        # Dispatching all transactions in one round trip
+        responses = batch_request(w3, "eth_sendRawTransaction",
+                                  [[rawtx] for _, rawtx in signed_txs])
+    except BaseException:
+        # Reserved nonces may not all have reached the node
+        nonce_manager.resync(sender.address)
+        raise
+    for (index, _), response in zip(signed_txs, responses):
+        if 'error' in response:
+            results[index]['error'] = response['error'].get('message')
+        else:
+            results[index]['tx_hash'] = receipt_tracker.track(
+                response['result'])
+    # Rejected transactions leave gaps in the local nonce counter
+    if any('error' in response for response in responses):
+        nonce_manager.resync(sender.address)
 
 
 def create_item(item_obj_list: List[item_objects.ItemCreate], ipfs,
-                tx_reqs: ProxyTXReqs) -> bool:
+                tx_reqs: ProxyTXReqs) -> List[str]:
     """
     Create Item Token
     """
+    tx_hashes = []
     for item_obj in item_obj_list:
         # Generates NFT metadata URL (hosted on IPFS)
         metadata_uri = create_metadata(ipfs, item_obj)
         # Mints Item NFT via smart contract
         try:
-            signed_tx = buildtx(
+            tx_hash = sendtx(
                 tx_reqs.contract.functions.MintToken(tx_reqs.target,
                                                      metadata_uri), tx_reqs)
-            tx_reqs.w3.eth.sendRawTransaction(signed_tx.rawTransaction)
         except exceptions.ContractLogicError as Error:
             OnChainExceptionHandler(Error)
-    # Returns True indicating successful creation
-    return True
+            raise
+        tx_hashes.append(receipt_tracker.track(tx_hash))
+    # Returns tracked transaction hashes
+    return tx_hashes
+
+
+def create_item_batch(item_obj_list: List[item_objects.ItemCreate], ipfs,
+                      tx_reqs: ProxyTXReqs) -> List[dict]:
+    """
+    Create Item Tokens in bulk
+    Metadata is uploaded concurrently, the senders key is decrypted once,
+    nonces are reserved consecutively and all mint transactions are
+    dispatched as a single JSON-RPC batch
+    """
+    results = [{'index': index, 'tx_hash': None, 'error': None}
+               for index in range(len(item_obj_list))]
+    # Generates NFT metadata URLs (hosted on IPFS)
+    with ThreadPoolExecutor(max_workers=IPFS_UPLOAD_CONCURRENCY) as executor:
+        uploads = [
+            executor.submit(create_metadata, ipfs, item_obj)
+            for item_obj in item_obj_list
+        ]
+    metadata_uris = {}
+    for index, upload in enumerate(uploads):
+        try:
+            metadata_uris[index] = upload.result()
+        except Exception as Error:
+            results[index]['error'] = f"Metadata upload failed: {Error}"
+    if not metadata_uris:
+        return results
+
+    # Loading senders account and shared transaction fields once
+    sender = load_sender(tx_reqs)
+    mint = tx_reqs.contract.functions.MintToken
+    txdeps = {
+        'from': sender.address,
+        'chainId': tx_reqs.w3.eth.chain_id,
+        **gas_oracle.fee_fields()
+    }
+    # Metadata URIs share a fixed length, so one estimate covers the batch
+    sample_uri = next(iter(metadata_uris.values()))
+    try:
+        gas_estimate = mint(tx_reqs.target, sample_uri).estimateGas(
+            {'from': sender.address})
+    except exceptions.ContractLogicError as Error:
+        OnChainExceptionHandler(Error)
+        raise
+    txdeps['gas'] = int(gas_estimate * BATCH_GAS_MARGIN)
+
+    # Signing and dispatching mint transactions with consecutive nonces
+    dispatch_batch(tx_reqs.w3, sender,
+                   [(index, mint(tx_reqs.target, metadata_uri), txdeps)
+                    for index, metadata_uri in metadata_uris.items()],
+                   results)
+    # Returns per-item transaction hashes and failures
+    return results
 
 
 def create_metadata(ipfs, item_obj: item_objects.ItemCreate) -> str:
@@ -46,25 +149,90 @@ def create_metadata(ipfs, item_obj: item_objects.ItemCreate) -> str:
     item_json = json.loads(item_obj.json())
     ipfs_metadata = ipfs.add_json(item_json)
     # Returns URL to IPFS-hosted metadata
-    return "http://127.0.0.1:8080/ipfs/{cid}".format(cid=ipfs_metadata)
+    return "{gateway}/ipfs/{cid}".format(gateway=IPFS_GATEWAY,
+                                         cid=ipfs_metadata)
 
 
 def transfer_item(item_id: int, receiver: str, tx_reqs: TXReqs,
-                  database: Session) -> bool:
+                  database: Session) -> str:
     """
     Transfer Item Token
     """
     # Transfers item NFT via smart contract
     try:
-        signed_tx = buildtx(
+        tx_hash = sendtx(
             tx_reqs.contract.functions.transferItemToken(
                 item_id,
                 get_user_publickey(database, receiver).decode()), tx_reqs)
-        tx_reqs.w3.eth.sendRawTransaction(signed_tx.rawTransaction)
     except exceptions.ContractLogicError as Error:
         OnChainExceptionHandler(Error)
-    # Returns True indicating successful transfer
-    return True
+        raise
+    # Returns tracked transaction hash
+    return receipt_tracker.track(tx_hash)
+
+
+def transfer_item_batch(transfers: List[item_objects.ItemTransfer],
+                        tx_reqs_map: Dict[int, TXReqs],
+                        database: Session) -> List[dict]:
+    """
+    Transfer Item Tokens in bulk
+    Receivers are resolved in one query, gas is estimated as one JSON-RPC
+    batch, nonces are reserved consecutively and all transfer transactions
+    are dispatched as a single JSON-RPC batch
+    """
+    results = [{
+        'index': index,
+        'item_id': transfer.item_id,
+        'tx_hash': None,
+        'error': None
+    } for index, transfer in enumerate(transfers)]
+    publickeys = get_user_publickeys(
+        database, [transfer.receiver for transfer in transfers])
+    calls = {}
+    for index, transfer in enumerate(transfers):
+        if transfer.item_id not in tx_reqs_map:
+            results[index]['error'] = "Nonexistent token"
+        elif transfer.receiver not in publickeys:
+            results[index]['error'] = "Unknown receiver"
+        else:
+            calls[index] = tx_reqs_map[
+                transfer.item_id].contract.functions.transferItemToken(
+                    transfer.item_id, publickeys[transfer.receiver].decode())
+    if not calls:
+        return results
+
+    # Loading senders account and shared transaction fields once
+    tx_reqs = next(iter(tx_reqs_map.values()))
+    sender = load_sender(tx_reqs)
+    txdeps = {
+        'from': sender.address,
+        'chainId': tx_reqs.w3.eth.chain_id,
+        **gas_oracle.fee_fields()
+    }
+
+    # Estimating gas of all transfers in one round trip
+    # Reverting transfers (e.g. not token owner) are reported and skipped
+    estimates = batch_request(
+        tx_reqs.w3, "eth_estimateGas", [[{
+            'from': sender.address,
+            'to': function.address,
+            'data': encode_call(function)
+        }] for function in calls.values()])
+    gas_limits = {}
+    for index, response in zip(calls, estimates):
+        if 'error' in response:
+            results[index]['error'] = response['error'].get('message')
+        else:
+            gas_limits[index] = int(response['result'], 16)
+    if not gas_limits:
+        return results
+
+    # Signing and dispatching transfer transactions with consecutive nonces
+    dispatch_batch(tx_reqs.w3, sender,
+                   [(index, calls[index], dict(txdeps, gas=gas_limit))
+                    for index, gas_limit in gas_limits.items()], results)
+    # Returns per-item transaction hashes and failures
+    return results
 
 
 def get_item(item_id: int, tx_reqs: TXReqs) -> dict:
@@ -87,43 +255,173 @@ def get_metadata(item_id: int, tx_reqs: TXReqs) -> dict:
     """
     Get Item Token metadata
     """
+    # Serves immutable metadata from cache where possible
+    cached = metadata_cache.get(item_id)
+    if cached is not None:
+        return dict(cached[1], id=item_id)
     # Fetches metadata URI -> loads as JSON
     try:
         rawuri = tx_reqs.contract.functions.tokenURI(item_id).call()
     except exceptions.ContractLogicError as Error:
         OnChainExceptionHandler(Error)
-    uri = urlopen(rawuri)
-    metadata = json.load(uri)
-    metadata['id'] = item_id
+        raise
+    metadata = metadata_fetcher.fetch(rawuri)
+    metadata_cache.set(item_id, uri_cid(rawuri), metadata)
+    metadata = dict(metadata, id=item_id)
     # Return JSONized metadata object
     return metadata
 
 
-# def get_user_items(database: Session, tx_reqs: TXReqs,
-#                    address: str) -> List[dict]:
-#     """
-#     Get Item Tokens currently owned by a user
-#     """
-#     owned_ids = tx_reqs.contract.functions.ownedItemTokens(address).call()
-#     owned_items = [get_item(tx_reqs, id) for id in owned_ids]
-#     # Return list of item metadatas
-#     return owned_items
+def read_items(item_ids: List[int], tx_reqs_map: Dict[int, TXReqs],
+               function_name: str) -> List[dict]:
+    """
+    Call a read-only item contract function for several items
+    All calls are dispatched as one JSON-RPC batch
+    """
+    results = [{
+        'item_id': item_id,
+        'result': None,
+        'error': None
+    } for item_id in item_ids]
+    calls = {}
+    for index, item_id in enumerate(item_ids):
+        if item_id not in tx_reqs_map:
+            results[index]['error'] = "Nonexistent token"
+        else:
+            calls[index] = getattr(tx_reqs_map[item_id].contract.functions,
+                                   function_name)(item_id)
+    if not calls:
+        return results
+    w3 = next(iter(tx_reqs_map.values())).w3
+    for index, (success, output) in zip(calls,
+                                        batch_call(w3, list(calls.values()))):
+        results[index]['result' if success else 'error'] = output
+    # Returns per-item call outputs and failures
+    return results
+
+
+def get_items(item_ids: List[int],
+              tx_reqs_map: Dict[int, TXReqs]) -> List[dict]:
+    """
+    Get Item Token metadata of several items
+    Uncached token URIs are read in one batch and fetched concurrently
+    """
+    results = [{
+        'item_id': item_id,
+        'result': None,
+        'error': None
+    } for item_id in item_ids]
+    uncached = []
+    for index, item_id in enumerate(item_ids):
+        cached = metadata_cache.get(item_id)
+        if cached is not None:
+            results[index]['result'] = dict(cached[1], id=item_id)
+        else:
+            uncached.append(index)
+    if not uncached:
+        return results
+    uris = read_items([item_ids[index] for index in uncached], tx_reqs_map,
+                      "tokenURI")
+    fetches = {}
+    with ThreadPoolExecutor(
+            max_workers=metadata_fetcher.concurrency) as executor:
+        for index, uri in zip(uncached, uris):
+            if uri['error'] is not None:
+                results[index]['error'] = uri['error']
+            else:
+                fetches[index] = (uri['result'],
+                                  executor.submit(metadata_fetcher.fetch,
+                                                  uri['result']))
+    for index, (rawuri, fetch) in fetches.items():
+        item_id = item_ids[index]
+        try:
+            metadata = fetch.result()
+        except MetadataFetchError as Error:
+            results[index]['error'] = Error.message
+            continue
+        metadata_cache.set(item_id, uri_cid(rawuri), metadata)
+        results[index]['result'] = dict(metadata, id=item_id)
+    # Returns per-item metadata and failures
+    return results
+
+
+def get_items_owner(item_ids: List[int], tx_reqs_map: Dict[int, TXReqs],
+                    database: Session) -> List[dict]:
+    """
+    Get owners of several Item Tokens
+    Owners are read in one batch and matched to users in one query
+    """
+    results = read_items(item_ids, tx_reqs_map, "ownerOf")
+    owners = {
+        bytes(result['result'], 'utf-8')
+        for result in results if result['error'] is None
+    }
+    user_table = db_schemas.User
+    db_users = {
+        db_user.publickey: db_user
+        for db_user in database.query(user_table).filter(
+            user_table.publickey.in_(owners)).options(
+                load_only('id', 'publickey', 'username'))
+    } if owners else {}
+    for result in results:
+        if result['error'] is not None:
+            continue
+        db_user = db_users.get(bytes(result['result'], 'utf-8'))
+        result['result'] = {
+            'publickey': result['result'],
+            'id': db_user.id if db_user else None,
+            'username': db_user.username if db_user else None
+        }
+    # Returns per-item owners and failures
+    return results
+
+
+def get_user_items(database: Session,
+                   publickey: bytes,
+                   skip: int = 0,
+                   limit: int = 50) -> List[dict]:
+    """
+    Get Item Tokens currently owned by a user
+    Reads the off-chain ownership index, joined with stored metadata;
+    remaining items are served from the metadata cache, or read in one
+    batch and fetched concurrently (failures are reported per item)
+    """
+    owner, metadata = db_schemas.Owner, db_schemas.ItemMetadata
+    owned_rows = (database.query(
+        owner.item_id, owner.contract, metadata.content).outerjoin(
+            metadata, metadata.item_id == owner.item_id).filter(
+                owner.owner == publickey).order_by(
+                    owner.item_id).offset(skip).limit(limit).all())
+    owned_items, uncached = {}, {}
+    for item_id, contract, content in owned_rows:
+        if content is not None:
+            owned_items[item_id] = dict(json.loads(content), id=item_id)
+        else:
+            uncached[item_id] = TXReqs(contract=contract.decode(),
+                                       abi=ItemContractABI)
+    if uncached:
+        for result in get_items(list(uncached), uncached):
+            item_id = result['item_id']
+            owned_items[item_id] = result['result'] or {
+                'id': item_id,
+                'error': result['error']
+            }
+    # Return list of item metadatas, in index order
+    return [owned_items[item_id] for item_id, _, _ in owned_rows]
 
 
-def set_item_claimability(
-        item_id: int,
-        tx_reqs: TXReqs) -> None:  # return to bool after updating contract
+def set_item_claimability(item_id: int, tx_reqs: TXReqs) -> str:
     """
     Set claimability status of an Item Token
     """
     try:
-        signed_tx = buildtx(
+        tx_hash = sendtx(
             tx_reqs.contract.functions.setItemClaimability(item_id), tx_reqs)
-        tx_reqs.w3.eth.sendRawTransaction(signed_tx.rawTransaction)
-        # change to assignment after updating contract
     except exceptions.ContractLogicError as Error:
         OnChainExceptionHandler(Error)
-    # Returns?
+        raise
+    # Returns tracked transaction hash
+    return receipt_tracker.track(tx_hash)
 
 
 def get_item_claimability(item_id: int, tx_reqs: TXReqs) -> bool:
@@ -135,37 +433,38 @@ def get_item_claimability(item_id: int, tx_reqs: TXReqs) -> bool:
             item_id).call()
     except exceptions.ContractLogicError as Error:
         OnChainExceptionHandler(Error)
+        raise
     # Return item claimability boolean
     return item_claimability
 
 
-def claim_item(item_id: int, tx_reqs: TXReqs) -> True:
+def claim_item(item_id: int, tx_reqs: TXReqs) -> str:
     """
     Claim Item Token
     """
     try:
-        signed_tx = buildtx(tx_reqs.contract.functions.claimItemToken(item_id),
-                            tx_reqs)
-        tx_reqs.w3.eth.sendRawTransaction(signed_tx.rawTransaction)
+        tx_hash = sendtx(tx_reqs.contract.functions.claimItemToken(item_id),
+                         tx_reqs)
     except exceptions.ContractLogicError as Error:
         OnChainExceptionHandler(Error)
-    # Return True indicating successful burn
-    return True
+        raise
+    # Returns tracked transaction hash
+    return receipt_tracker.track(tx_hash)
 
 
-def burn_item_token(item_id: int, tx_reqs: ProxyTXReqs) -> True:
+def burn_item_token(item_id: int, tx_reqs: ProxyTXReqs) -> str:
     """
     Burn Item Token
     """
     try:
-        signed_tx = buildtx(
+        tx_hash = sendtx(
             tx_reqs.contract.functions.BurnToken(tx_reqs.target, item_id),
             tx_reqs)
-        tx_reqs.w3.eth.sendRawTransaction(signed_tx.rawTransaction)
     except exceptions.ContractLogicError as Error:
         OnChainExceptionHandler(Error)
-    # Return True indicating successful burn
-    return True
+        raise
+    # Returns tracked transaction hash
+    return receipt_tracker.track(tx_hash)
 
 
 def toggle_item_missing(database: Session, tx_reqs: TXReqs,
@@ -179,11 +478,7 @@ def toggle_item_missing(database: Session, tx_reqs: TXReqs,
     except exceptions.ContractLogicError as Error:
         OnChainExceptionHandler(Error)
     # Obtain public key of caller
-    try:
-        address = Account.from_key(
-            aes_decrypt(tx_reqs.privatekey, tx_reqs.passkey)).address
-    except TypeError:
-        raise CredentialError
+    address = load_sender(tx_reqs).address
     # If the caller is not the token owner, raise exception
     if address != item_owner:
         raise OwnershipError
@@ -3,7 +3,8 @@ Item Objects
 """
 from typing import List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, validator
+from treepoem import barcode_types
 
 
 class ItemAttribute(BaseModel):
@@ -25,12 +26,37 @@ class ItemCreate(BaseModel):
     attributes: List[ItemAttribute]
 
 
+class ItemTransfer(BaseModel):
+    """
+    Item Transfer Object
+    """
+    item_id: int
+    receiver: str
+
+
+class LabelCode(BaseModel):
+    """
+    Label Code Object
+    code_type is any treepoem/BWIPP barcode type, validated up front
+    (data that cannot be encoded is only detected upon rendering)
+    """
+    code_type: str = "qrcode"
+    data: str
+
+    @validator("code_type")
+    def supported_code_type(cls, code_type: str) -> str:
+        if code_type not in barcode_types:
+            raise ValueError(f"Unsupported code type: {code_type}")
+        return code_type
+
+
 class Item(ItemCreate):
     """
     Item Database Object
     """
     id: int
-    transfers: int
+    # Not recorded in token metadata (yet), so optional
+    transfers: Optional[int] = None
     verifications = int
     stolen_status = bool
     lost_status = bool
@@ -1,8 +1,28 @@
 """
 QR-Code Generation
 """
+import multiprocessing
+import zipfile
+from asyncio import gather, get_running_loop
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from os import getenv
+from threading import Lock
+from typing import Iterator, List, Tuple
+
+import segno
+from PIL import Image
 from treepoem import generate_barcode
 
+from ...caching.cache_objects import LRUCache
+from ...exceptions.exception_objects import CodeRenderError
+from ...metrics.metrics_methods import register_cache
+
+
+QR_WORKERS = int(getenv('QR_WORKERS', '4'))
+QR_CACHE_SIZE = int(getenv('QR_CACHE_SIZE', '4096'))
+QR_SCALE = 4  # Pixels per module of fast path QR codes
+
 
 def generate_code(code_type: str, data: str) -> bytes:
     code = generate_barcode(barcode_type=code_type, data=data)
@@ -10,3 +30,131 @@ def generate_code(code_type: str, data: str) -> bytes:
     # Returning a monochrome instance of the code for filesize reduction via
     # .convert("1")
     return code.convert("1")
+
+
+def render_code(code_type: str, data: str) -> bytes:
+    """
+    Render code as monochrome PNG
+    Plain QR codes are encoded in-process by segno, everything else
+    goes through treepoem/Ghostscript
+    """
+    output = BytesIO()
+    if code_type == "qrcode":
+        segno.make_qr(data, error="m", boost_error=False).save(output,
+                                                              kind="png",
+                                                              scale=QR_SCALE)
+    else:
+        generate_code(code_type, data).save(output, format="PNG")
+    return output.getvalue()
+
+
+class _ZipStream:
+    """
+    Write-only buffer handing out zip bytes as they are written
+    """
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, chunk: bytes) -> int:
+        self.chunks.append(bytes(chunk))
+        return len(chunk)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data, self.chunks = b"".join(self.chunks), []
+        return data
+
+
+class CodeRenderer:
+    """
+    Batch code renderer -
+    Renders codes in parallel across a process pool, caching rendered
+    codes by (type, data)
+    """
+    def __init__(self, workers: int = 4, cache_size: int = 4096):
+        self.workers = workers
+        self.cache = LRUCache(cache_size)
+        self.lock = Lock()
+        self.executor = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        """
+        Process pool, started on first use
+        """
+        with self.lock:
+            if self.executor is None:
+                # Forkserver children start clean, rather than forking the
+                # API process along with its web3, KDF and tracker threads
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("forkserver"))
+            return self.executor
+
+    async def render(self, code_type: str, data: str) -> bytes:
+        """
+        Await rendered PNG of a single code
+        """
+        key = (code_type, data)
+        png = self.cache.get(key)
+        if png is None:
+            loop = get_running_loop()
+            png = await loop.run_in_executor(self._pool(), render_code,
+                                             code_type, data)
+            self.cache.set(key, png)
+        return png
+
+    async def render_many(self, codes: List[Tuple[str, str]]) -> List[bytes]:
+        """
+        Await rendered PNGs of several codes, duplicates are rendered once
+        Raises CodeRenderError for the first code (in request order) that
+        fails to render, once all renders have settled
+        """
+        unique = list(dict.fromkeys(codes))
+        renders = await gather(*(self.render(*key) for key in unique),
+                               return_exceptions=True)
+        pngs = dict(zip(unique, renders))
+        for index, key in enumerate(codes):
+            if isinstance(pngs[key], Exception):
+                raise CodeRenderError(index, f"Code {index}: {pngs[key]}")
+        return [pngs[key] for key in codes]
+
+    @staticmethod
+    def stream_zip(pngs: List[bytes]) -> Iterator[bytes]:
+        """
+        Stream zip archive of rendered codes, in request order
+        """
+        stream = _ZipStream()
+        with zipfile.ZipFile(stream, mode="w",
+                             compression=zipfile.ZIP_STORED) as archive:
+            for index, png in enumerate(pngs):
+                archive.writestr(f"{index:05d}.png", png)
+                yield stream.drain()
+        yield stream.drain()
+
+    @staticmethod
+    def build_pdf(pngs: List[bytes]) -> bytes:
+        """
+        Multi-page PDF of rendered codes, one code per page
+        """
+        pages = [Image.open(BytesIO(png)).convert("1") for png in pngs]
+        output = BytesIO()
+        pages[0].save(output,
+                      format="PDF",
+                      save_all=True,
+                      append_images=pages[1:])
+        return output.getvalue()
+
+    def shutdown(self) -> None:
+        """
+        Stop process pool
+        """
+        with self.lock:
+            if self.executor is not None:
+                self.executor.shutdown(wait=False)
+                self.executor = None
+
+
+code_renderer = CodeRenderer(workers=QR_WORKERS, cache_size=QR_CACHE_SIZE)
+register_cache("codes", code_renderer.cache)
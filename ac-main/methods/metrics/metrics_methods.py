@@ -0,0 +1,201 @@
+"""
+Metrics Methods/Functions
+Application metrics and the hooks feeding them
+"""
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from time import perf_counter
+from typing import Iterator
+
+from sqlalchemy import event
+
+from .metrics_objects import Counter, Gauge, Histogram, MetricsRegistry
+
+
+registry = MetricsRegistry()
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+http_request_duration = registry.register(
+    Histogram("http_request_duration_seconds",
+              "HTTP request latency by endpoint",
+              ("method", "endpoint", "status")))
+rpc_request_duration = registry.register(
+    Histogram("rpc_request_duration_seconds",
+              "JSON-RPC request latency by method", ("method", )))
+rpc_errors = registry.register(
+    Counter("rpc_errors_total",
+            "JSON-RPC requests failing or returning errors", ("method", )))
+db_query_duration = registry.register(
+    Histogram("db_query_duration_seconds",
+              "Database statement latency by engine and statement type",
+              ("engine", "statement")))
+ipfs_fetch_duration = registry.register(
+    Histogram("ipfs_fetch_duration_seconds",
+              "IPFS metadata fetch latency by source and outcome",
+              ("source", "outcome")))
+ingest_head_block = registry.register(
+    Gauge("ingest_head_block", "Latest chain block seen by ingester",
+          ("filter", )))
+ingest_checkpoint_block = registry.register(
+    Gauge("ingest_checkpoint_block", "Last block ingested", ("filter", )))
+ingest_block_lag = registry.register(
+    Gauge("ingest_block_lag", "Blocks between chain head and last ingested",
+          ("filter", )))
+
+# Caches reporting their stats() on every scrape
+caches = {}
+caches_lock = Lock()
+
+
+def register_cache(name: str, cache) -> None:
+    """
+    Report hit/miss/size stats of a cache (anything with stats())
+    """
+    with caches_lock:
+        caches[name] = cache
+
+
+def _flatten_stats(prefix: tuple, stats: dict) -> Iterator[tuple]:
+    for key, value in stats.items():
+        if isinstance(value, dict):
+            yield from _flatten_stats(prefix + (key, ), value)
+        else:
+            yield prefix, key, value
+
+
+def _collect_cache_stats() -> dict:
+    with caches_lock:
+        registered = list(caches.items())
+    values = {}
+    for name, cache in registered:
+        for tier, stat, value in _flatten_stats((), cache.stats()):
+            values[(".".join((name, ) + tier), stat)] = value
+    return values
+
+
+registry.register(
+    Gauge("cache_stats", "Cache sizes and hit/miss counters",
+          ("cache", "stat"), _collect_cache_stats))
+
+
+@contextmanager
+def timed(histogram: Histogram, *labels: str) -> Iterator[None]:
+    """
+    Observe duration of the enclosed block
+    """
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        histogram.observe(perf_counter() - start, *labels)
+
+
+def web3_metrics_middleware(make_request, w3):
+    """
+    web3 middleware timing every RPC request by method
+    """
+    def middleware(method, params):
+        try:
+            with timed(rpc_request_duration, method):
+                response = make_request(method, params)
+        except Exception:
+            rpc_errors.inc(method)
+            raise
+        if "error" in response:
+            rpc_errors.inc(method)
+        return response
+
+    return middleware
+
+
+def instrument_engine(engine, name: str) -> None:
+    """
+    Time every statement executed through a SQLAlchemy engine
+    """
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context,
+                              executemany):
+        conn.info.setdefault("query_start", []).append(perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context,
+                             executemany):
+        start = conn.info["query_start"].pop()
+        # Statement type (SELECT/INSERT/...) keeps label cardinality bounded
+        db_query_duration.observe(perf_counter() - start, name,
+                                  statement.lstrip().split(None, 1)[0].upper())
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        # Failed statements never reach after_cursor_execute
+        if exception_context.connection is not None:
+            starts = exception_context.connection.info.get("query_start")
+            if starts:
+                starts.pop()
+
+
+class HTTPMetricsMiddleware:
+    """
+    ASGI middleware timing every HTTP request by endpoint
+    Plain ASGI rather than BaseHTTPMiddleware, so responses (streaming
+    ones included) pass through without an extra task per request
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status_code = 500
+
+        async def send_status(message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_status)
+        finally:
+            # Labelled by endpoint function (set on the scope by routing)
+            # rather than raw path, so path parameters do not inflate series
+            endpoint = scope.get("endpoint")
+            http_request_duration.observe(
+                perf_counter() - start, scope["method"],
+                endpoint.__name__ if endpoint else "unmatched",
+                str(status_code))
+
+
+def record_ingest_progress(name: str, head: int, checkpoint: int) -> None:
+    """
+    Report ingester position relative to the chain head
+    """
+    ingest_head_block.set(head, name)
+    ingest_checkpoint_block.set(checkpoint, name)
+    ingest_block_lag.set(max(head - checkpoint, 0), name)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        body = registry.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", METRICS_CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+def serve_metrics(port: int) -> ThreadingHTTPServer:
+    """
+    Serve metrics over HTTP from a background thread
+    (for processes without the API, e.g. a standalone ingester)
+    """
+    server = ThreadingHTTPServer(("", port), _MetricsHandler)
+    Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server
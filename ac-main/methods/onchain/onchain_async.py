@@ -0,0 +1,31 @@
+"""
+Asynchronous On-Chain Interface
+Runs blocking web3 calls on a dedicated thread pool sharing
+the providers keep-alive HTTP session
+"""
+from asyncio import get_running_loop
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from .onchain_config import WEB3_POOL_SIZE
+
+
+onchain_executor = ThreadPoolExecutor(max_workers=WEB3_POOL_SIZE,
+                                      thread_name_prefix="web3")
+
+
+async def run_onchain(function, *args, **kwargs):
+    """
+    Await a blocking on-chain function without stalling the event loop
+    """
+    loop = get_running_loop()
+    return await loop.run_in_executor(onchain_executor,
+                                      partial(function, *args, **kwargs))
+
+
+async def call(contract_function, *args, **kwargs):
+    """
+    Await a read-only contract function call
+    """
+    return await run_onchain(contract_function.call, *args, **kwargs)
+
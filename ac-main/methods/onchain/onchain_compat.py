@@ -0,0 +1,10 @@
+"""
+web3 Private Helper Shim
+JSON-RPC batches bypass ContractFunction.call and the provider, so their
+raw requests and outputs are handled with web3 internals that have no
+public equivalent. These are private (web3._utils) and may move between
+releases: every such import lives here, pinned against web3 5.23
+"""
+from web3._utils.abi import get_abi_output_types, map_abi_data  # noqa: F401
+from web3._utils.normalizers import BASE_RETURN_NORMALIZERS  # noqa: F401
+from web3._utils.request import make_post_request  # noqa: F401
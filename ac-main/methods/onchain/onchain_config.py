@@ -2,12 +2,69 @@
 On-Chain Configuration
 """
 from os import getenv
+from threading import Lock
 
+from requests import Session
+from requests.adapters import HTTPAdapter
 from web3 import Web3
 
+from ..metrics.metrics_methods import register_cache, web3_metrics_middleware
 from .ProxyContractABI import ProxyContractABI
+from .onchain_gas import GasPriceOracle
+from .onchain_nonce import NonceManager
+from .onchain_signer import SignerSessions
 
 
-w3 = Web3(Web3.HTTPProvider(getenv('WEB3_URL')))
-proxy_contract = w3.eth.contract(address=getenv('PROXY_ADDRESS'),
-                                 abi=ProxyContractABI)
+# Keep-alive connection pool shared by all threads issuing RPC calls
+WEB3_POOL_SIZE = int(getenv('WEB3_POOL_SIZE', '64'))
+
+# Clients are created on first use, so importing is free of network setup
+clients_lock = Lock()
+w3 = None
+proxy_contract = None
+
+
+def get_w3() -> Web3:
+    """
+    Web3 client over a pooled keep-alive HTTP session
+    """
+    global w3
+    if w3 is None:
+        with clients_lock:
+            if w3 is None:
+                web3_session = Session()
+                adapter = HTTPAdapter(pool_connections=1,
+                                      pool_maxsize=WEB3_POOL_SIZE)
+                web3_session.mount("http://", adapter)
+                web3_session.mount("https://", adapter)
+                client = Web3(
+                    Web3.HTTPProvider(getenv('WEB3_URL'),
+                                      session=web3_session))
+                client.middleware_onion.add(web3_metrics_middleware,
+                                            name="metrics")
+                w3 = client
+    return w3
+
+
+def get_proxy_contract():
+    """
+    Proxy contract instance
+    """
+    global proxy_contract
+    if proxy_contract is None:
+        contract = get_w3().eth.contract(address=getenv('PROXY_ADDRESS'),
+                                         abi=ProxyContractABI)
+        with clients_lock:
+            if proxy_contract is None:
+                proxy_contract = contract
+    return proxy_contract
+
+
+nonce_manager = NonceManager(get_w3)
+gas_oracle = GasPriceOracle(get_w3,
+                            refresh_interval=float(
+                                getenv('GAS_REFRESH_INTERVAL', '5')),
+                            eip1559=getenv('GAS_EIP1559') == "true")
+register_cache("gas_price", gas_oracle)
+signer_sessions = SignerSessions(
+    idle_ttl=float(getenv('SIGNER_IDLE_TTL', '300')))
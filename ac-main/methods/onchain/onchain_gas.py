@@ -0,0 +1,103 @@
+"""
+On-Chain Gas Price Oracle
+"""
+from threading import Event, Lock, Thread
+from time import monotonic
+
+
+class GasPriceOracle:
+    """
+    Shared gas price cache -
+    Refreshes fee data in a background thread every refresh_interval
+    seconds; reads falling outside of that window refresh inline
+    """
+    def __init__(self,
+                 get_w3,
+                 refresh_interval: float = 5,
+                 eip1559: bool = False):
+        self.get_w3 = get_w3
+        self.refresh_interval = refresh_interval
+        self.eip1559 = eip1559
+        self.lock = Lock()
+        self.stopped = Event()
+        self.thread = None
+        self.fees = None
+        self.updated = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def w3(self):
+        return self.get_w3()
+
+    def _fetch(self) -> dict:
+        """
+        Fetch current fee data from node
+        """
+        if self.eip1559:
+            base_fee = self.w3.eth.get_block("pending")["baseFeePerGas"]
+            priority_fee = self.w3.eth.max_priority_fee
+            return {
+                'maxFeePerGas': 2 * base_fee + priority_fee,
+                'maxPriorityFeePerGas': priority_fee
+            }
+        return {'gasPrice': self.w3.eth.gas_price}
+
+    def refresh(self) -> dict:
+        """
+        Refresh cached fee data
+        """
+        fees = self._fetch()
+        with self.lock:
+            self.fees, self.updated = fees, monotonic()
+        return fees
+
+    def fee_fields(self) -> dict:
+        """
+        Transaction fee fields, either gasPrice or EIP-1559 fee caps
+        """
+        self.start()
+        with self.lock:
+            fresh = (self.fees is not None
+                     and monotonic() - self.updated < self.refresh_interval)
+            if fresh:
+                self.hits += 1
+                return dict(self.fees)
+            self.misses += 1
+        return dict(self.refresh())
+
+    def _run(self) -> None:
+        """
+        Background refresh loop
+        """
+        while not self.stopped.wait(self.refresh_interval * 0.8):
+            try:
+                self.refresh()
+            except Exception:
+                # Node hiccups fall back to inline refreshes on read
+                continue
+
+    def start(self) -> None:
+        """
+        Start background refresh thread (once)
+        """
+        if self.thread is not None or self.refresh_interval <= 0:
+            return
+        with self.lock:
+            if self.thread is None:
+                self.thread = Thread(target=self._run,
+                                     name="gas-oracle",
+                                     daemon=True)
+                self.thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop background refresh thread
+        """
+        self.stopped.set()
+
+    def stats(self) -> dict:
+        """
+        Cache hit/miss counters
+        """
+        return {'hits': self.hits, 'misses': self.misses}
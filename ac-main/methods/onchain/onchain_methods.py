@@ -1,10 +1,15 @@
 """
 On-Chain Methods/Functions
 """
-from typing import Union
+import json
+from typing import Dict, List, Optional, Tuple, Union
 
 from eth_account.datastructures import SignedTransaction
+from eth_account.signers.local import LocalAccount
 from eth_utils.exceptions import ValidationError
+from hexbytes import HexBytes
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, load_only
 
 from ..cryptography.aes_methods import aes_decrypt
@@ -13,44 +18,166 @@ from ..exceptions.exception_objects import (
     NonExistentTokenError,
     NotOperatorError,
     PrivateKeyError,
+    SignerSessionError,
 )
+from ..metrics.metrics_methods import rpc_errors, rpc_request_duration, timed
 from .ItemContractABI import ItemContractABI
 from .ProxyContractABI import ProxyContractABI
-from .onchain_objects import ProxyTXReqs, TXReqs
+from .onchain_compat import (
+    BASE_RETURN_NORMALIZERS,
+    get_abi_output_types,
+    make_post_request,
+    map_abi_data,
+)
+from .onchain_config import gas_oracle, nonce_manager, signer_sessions
+from .onchain_nonce import is_nonce_error
+from .onchain_objects import ProxyTXReqs, TXReqs, contract_registry
 
 
-def buildtx(function, tx_reqs: Union[TXReqs,
-                                     ProxyTXReqs]) -> SignedTransaction:
+def unlock_account(w3, accesskey: bytes, passkey: str) -> LocalAccount:
     """
-    Builds and signs transaction to be dispatched on-chain
+    Decrypts private key and loads its account
     """
-    # Loading senders account
-    privatekey = aes_decrypt(tx_reqs.privatekey, tx_reqs.passkey)
+    privatekey = aes_decrypt(accesskey, passkey)
     try:
-        sender = tx_reqs.w3.eth.account.privateKeyToAccount(
-            privatekey.decode())
+        account = w3.eth.account.privateKeyToAccount(privatekey.decode())
     except (ValidationError, ValueError):
         raise PrivateKeyError
+    return account
+
+
+def load_sender(tx_reqs: Union[TXReqs, ProxyTXReqs]) -> LocalAccount:
+    """
+    Loads senders account -
+    From their unlocked signer session, else by decrypting their key
+    """
+    if tx_reqs.account is not None:
+        return tx_reqs.account
+    if tx_reqs.passkey is None:
+        raise SignerSessionError("Passkey or signer session required")
+    return unlock_account(tx_reqs.w3, tx_reqs.privatekey, tx_reqs.passkey)
+
+
+def resolve_signer(signer: Optional[str],
+                   db_user: db_schemas.User) -> Optional[LocalAccount]:
+    """
+    Unlocked account of users signer session, if a handle was given
+    """
+    if signer is None:
+        return None
+    return signer_sessions.get(signer, db_user.id)
+
+
+def buildtx(function,
+            tx_reqs: Union[TXReqs, ProxyTXReqs],
+            sender: Optional[LocalAccount] = None) -> SignedTransaction:
+    """
+    Builds and signs transaction to be dispatched on-chain
+    """
+    # Loading senders account
+    if sender is None:
+        sender = load_sender(tx_reqs)
 
     # Building tx
-    txdeps = {
-        'from': sender.address,
-        'gasPrice': tx_reqs.w3.eth.gas_price,
-        'nonce': tx_reqs.w3.eth.getTransactionCount(sender.address)
-    }
+    # Nonce is assigned after gas estimation so that reverted builds
+    # do not consume a nonce from the local counter
+    txdeps = {'from': sender.address, **gas_oracle.fee_fields()}
     rawtx = function.buildTransaction(txdeps)
+    rawtx['nonce'] = nonce_manager.next_nonce(sender.address)
 
     # Signing and returning transaction object
     signed_tx = sender.signTransaction(rawtx)
     return signed_tx
 
 
-def build_mint_tx(db_user: db_schemas.User, passkey: str,
-                  database: Session) -> TXReqs:
+def sendtx(function, tx_reqs: Union[TXReqs, ProxyTXReqs]) -> HexBytes:
+    """
+    Builds, signs and dispatches transaction on-chain
+    Resynchronises the senders nonce and retries once upon nonce errors
+    """
+    sender = load_sender(tx_reqs)
+    for attempt in range(2):
+        signed_tx = buildtx(function, tx_reqs, sender)
+        try:
+            return tx_reqs.w3.eth.sendRawTransaction(signed_tx.rawTransaction)
+        except ValueError as Error:
+            # Any rejected transaction leaves a gap in the local counter
+            nonce_manager.resync(sender.address)
+            if attempt or not is_nonce_error(Error):
+                raise
+
+
+def batch_request(w3, method: str, params_list: List[list]) -> List[dict]:
+    """
+    Dispatches a JSON-RPC batch of method calls over the providers session
+    Returns responses in the order of params_list
+    """
+    if not params_list:
+        return []
+    batch = [{
+        'jsonrpc': "2.0",
+        'id': request_id,
+        'method': method,
+        'params': params
+    } for request_id, params in enumerate(params_list)]
+    # Batches bypass web3 middleware, so are timed here
+    label = f"batch:{method}"
+    try:
+        with timed(rpc_request_duration, label):
+            raw_response = make_post_request(
+                w3.provider.endpoint_uri, json.dumps(batch).encode(),
+                **w3.provider.get_request_kwargs())
+    except Exception:
+        rpc_errors.inc(label)
+        raise
+    responses = json.loads(raw_response)
+    # Single error objects are returned by nodes rejecting the whole batch
+    if isinstance(responses, dict):
+        responses = [responses] * len(batch)
+    return sorted(responses, key=lambda response: response.get('id') or 0)
+
+
+def encode_call(function) -> str:
+    """
+    ABI-encoded call data of a bound contract function
+    """
+    contract = contract_registry.get(function.address, function.contract_abi)
+    return contract.encodeABI(fn_name=function.fn_name,
+                              args=function.args,
+                              kwargs=function.kwargs)
+
+
+def batch_call(w3, functions: list) -> List[Tuple[bool, object]]:
+    """
+    Runs read-only contract function calls as one JSON-RPC eth_call batch
+    Returns (True, decoded output) or (False, error message) per function
+    """
+    responses = batch_request(w3, "eth_call", [[{
+        'to': function.address,
+        'data': encode_call(function)
+    }, "latest"] for function in functions])
+    results = []
+    for function, response in zip(functions, responses):
+        if 'error' in response:
+            results.append((False, response['error'].get('message')))
+            continue
+        output_types = get_abi_output_types(function.abi)
+        output = w3.codec.decode_abi(output_types,
+                                     HexBytes(response['result']))
+        # Normalised as by ContractFunction.call (checksummed addresses)
+        output = map_abi_data(BASE_RETURN_NORMALIZERS, output_types, output)
+        results.append((True, output[0] if len(output) == 1 else output))
+    return results
+
+
+def build_mint_tx(db_user: db_schemas.User,
+                  passkey: Optional[str],
+                  database: Session,
+                  account: Optional[LocalAccount] = None) -> TXReqs:
     """
     Builds transaction sender object for proxy contract token minting
     """
-    if db_user.type != "operator":
+    if db_user.type != db_schemas.AccountType.operator:
         raise NotOperatorError
     db_operator = database.query(db_schemas.Operator).filter(
         db_schemas.Operator.id == db_user.id).options(
@@ -58,12 +185,16 @@ def build_mint_tx(db_user: db_schemas.User, passkey: str,
     if not db_operator:
         raise NotOperatorError
     return ProxyTXReqs(target=db_operator.contract.decode(),
-                       privatekey=db_operator.accesskey,
-                       passkey=passkey)
+                       privatekey=db_user.accesskey,
+                       passkey=passkey,
+                       account=account)
 
 
-def build_burn_tx(item_id: int, db_user: db_schemas.User, passkey: str,
-                  database: Session) -> TXReqs:
+def build_burn_tx(item_id: int,
+                  db_user: db_schemas.User,
+                  passkey: Optional[str],
+                  database: Session,
+                  account: Optional[LocalAccount] = None) -> TXReqs:
     """
     Builds transaction sender object for proxy contract token burning
     """
@@ -71,7 +202,8 @@ def build_burn_tx(item_id: int, db_user: db_schemas.User, passkey: str,
         db_schemas.Item.id == item_id).options(load_only('contract')).first()
     return ProxyTXReqs(target=db_item.contract.decode(),
                        privatekey=db_user.accesskey,
-                       passkey=passkey)
+                       passkey=passkey,
+                       account=account)
 
 
 def build_item_call(item_id: int, database: Session) -> TXReqs:
@@ -85,11 +217,72 @@ def build_item_call(item_id: int, database: Session) -> TXReqs:
     return TXReqs(contract=db_item.contract.decode(), abi=ItemContractABI)
 
 
-def build_item_tx(item_id: int, db_user: db_schemas.User, passkey: str,
-                  database: Session) -> TXReqs:
+async def build_item_call_async(item_id: int,
+                                database: AsyncSession) -> TXReqs:
+    """
+    Builds basic call sender object for item contract interaction
+    (asynchronous session)
+    """
+    contract = (await database.execute(
+        select(db_schemas.Item.contract).where(
+            db_schemas.Item.id == item_id))).scalar()
+    if contract is None:
+        raise NonExistentTokenError
+    return TXReqs(contract=contract.decode(), abi=ItemContractABI)
+
+
+def build_item_tx(item_id: int,
+                  db_user: db_schemas.User,
+                  passkey: Optional[str],
+                  database: Session,
+                  account: Optional[LocalAccount] = None) -> TXReqs:
     """
     Builds transaction sender object for item contract interaction
     """
     tx_reqs = build_item_call(item_id, database)
     tx_reqs.privatekey, tx_reqs.passkey = db_user.accesskey, passkey
+    tx_reqs.account = account
     return tx_reqs
+
+
+def build_items_call(item_ids: List[int],
+                     database: Session) -> Dict[int, TXReqs]:
+    """
+    Builds basic call sender objects for several item contracts
+    Contracts are resolved in one query, unknown items are left out
+    """
+    db_items = database.query(
+        db_schemas.Item.id,
+        db_schemas.Item.contract).filter(db_schemas.Item.id.in_(
+            set(item_ids))).all()
+    return {
+        item_id: TXReqs(contract=contract.decode(), abi=ItemContractABI)
+        for item_id, contract in db_items
+    }
+
+
+def build_items_tx(
+        item_ids: List[int],
+        db_user: db_schemas.User,
+        passkey: Optional[str],
+        database: Session,
+        account: Optional[LocalAccount] = None) -> Dict[int, TXReqs]:
+    """
+    Builds transaction sender objects for several item contract interactions
+    """
+    tx_reqs_map = build_items_call(item_ids, database)
+    for tx_reqs in tx_reqs_map.values():
+        tx_reqs.privatekey, tx_reqs.passkey = db_user.accesskey, passkey
+        tx_reqs.account = account
+    return tx_reqs_map
+
+
+def warm_contract_registry(database: Session) -> int:
+    """
+    Registers item contract instances of all contracts in the items table
+    Returns number of contracts registered
+    """
+    contracts = database.query(db_schemas.Item.contract).distinct().all()
+    for (contract, ) in contracts:
+        contract_registry.get(contract.decode(), ItemContractABI)
+    return len(contracts)
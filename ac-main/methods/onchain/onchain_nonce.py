@@ -0,0 +1,67 @@
+"""
+On-Chain Nonce Management
+"""
+from threading import Lock
+
+
+# Node error messages indicating the local nonce counter has drifted
+NONCE_ERRORS = ("nonce too low", "replacement transaction underpriced",
+                "replacement underpriced")
+
+
+def is_nonce_error(exception: Exception) -> bool:
+    """
+    Checks whether an RPC error was caused by a stale nonce
+    """
+    error_message = str(exception).lower()
+    return any(error in error_message for error in NONCE_ERRORS)
+
+
+class NonceManager:
+    """
+    Per-sender nonce counter -
+    Hands out nonces locally, synchronising with the node
+    on first use of an address and after nonce errors
+    """
+    def __init__(self, get_w3):
+        self.get_w3 = get_w3
+        self.lock = Lock()
+        self.nonces = {}
+
+    @property
+    def w3(self):
+        return self.get_w3()
+
+    def _sync(self, address: str) -> int:
+        """
+        Fetch pending transaction count of address from node
+        Caller must hold self.lock
+        """
+        nonce = self.w3.eth.getTransactionCount(address, "pending")
+        self.nonces[address] = nonce
+        return nonce
+
+    def reserve(self, address: str, count: int = 1) -> int:
+        """
+        Reserve count consecutive nonces for address
+        Returns the first reserved nonce
+        """
+        with self.lock:
+            nonce = self.nonces.get(address)
+            if nonce is None:
+                nonce = self._sync(address)
+            self.nonces[address] = nonce + count
+        return nonce
+
+    def next_nonce(self, address: str) -> int:
+        """
+        Reserve a single nonce for address
+        """
+        return self.reserve(address)
+
+    def resync(self, address: str) -> int:
+        """
+        Discard local counter of address and refetch from node
+        """
+        with self.lock:
+            return self._sync(address)
@@ -1,9 +1,66 @@
 """
 On-Chain Objects
 """
+import json
+from hashlib import sha256
+from os import getenv
 from typing import Optional
 
-from .onchain_config import proxy_contract, w3
+from eth_account.signers.local import LocalAccount
+
+from ..caching.cache_objects import LRUCache
+from ..metrics.metrics_methods import register_cache
+from .onchain_config import get_proxy_contract, get_w3
+
+
+class ContractRegistry:
+    """
+    Bounded LRU registry of contract instances -
+    Keyed by checksum address and ABI digest, so that ABIs are
+    parsed once per contract rather than once per request
+    """
+    def __init__(self, get_w3, maxsize: int = 1024):
+        self.get_w3 = get_w3
+        self.contracts = LRUCache(maxsize)
+        self.abi_keys = {}
+
+    @property
+    def w3(self):
+        return self.get_w3()
+
+    def _abi_key(self, abi: list) -> str:
+        """
+        Digest of ABI, memoized per ABI object
+        """
+        abi_key = self.abi_keys.get(id(abi))
+        if abi_key is None:
+            digest = sha256(json.dumps(abi, sort_keys=True).encode())
+            # ABI object is retained so its id cannot be reused
+            abi_key = self.abi_keys[id(abi)] = (digest.hexdigest(), abi)
+        return abi_key[0]
+
+    def get(self, address: str, abi: list):
+        """
+        Get (or construct and register) contract instance
+        """
+        key = (self.w3.toChecksumAddress(address), self._abi_key(abi))
+        contract = self.contracts.get(key)
+        if contract is None:
+            contract = self.w3.eth.contract(address=key[0], abi=abi)
+            self.contracts.set(key, contract)
+        return contract
+
+    def invalidate(self, address: str) -> None:
+        """
+        Drop all registered instances of contract address
+        """
+        address = self.w3.toChecksumAddress(address)
+        self.contracts.invalidate_where(lambda key: key[0] == address)
+
+
+contract_registry = ContractRegistry(
+    get_w3, maxsize=int(getenv('CONTRACT_CACHE_SIZE', '1024')))
+register_cache("contracts", contract_registry.contracts)
 
 
 class TXReqs:
@@ -14,20 +71,27 @@ class TXReqs:
                  contract: str,
                  abi: list,
                  privatekey: Optional[bytes] = None,
-                 passkey: Optional[str] = None):
+                 passkey: Optional[str] = None,
+                 account: Optional[LocalAccount] = None):
         self.privatekey = privatekey
         self.passkey = passkey
-        self.w3 = w3
-        self.contract = w3.eth.contract(address=contract, abi=abi)
+        self.account = account
+        self.w3 = get_w3()
+        self.contract = contract_registry.get(contract, abi)
 
 
 class ProxyTXReqs:
     """
     Proxy Contract TX Sending Object
     """
-    def __init__(self, target: str, privatekey: bytes, passkey: str):
-        self.w3 = w3
-        self.contract = proxy_contract
+    def __init__(self,
+                 target: str,
+                 privatekey: bytes,
+                 passkey: Optional[str] = None,
+                 account: Optional[LocalAccount] = None):
+        self.w3 = get_w3()
+        self.contract = get_proxy_contract()
         self.target = target
         self.privatekey = privatekey
         self.passkey = passkey
+        self.account = account
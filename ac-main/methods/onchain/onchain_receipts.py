@@ -0,0 +1,164 @@
+"""
+On-Chain Transaction Receipt Tracking
+"""
+import logging
+from os import getenv
+from threading import Event, Lock, Thread
+from time import monotonic
+from typing import Optional
+
+from hexbytes import HexBytes
+
+from ..caching.cache_objects import LRUCache
+from .onchain_config import get_w3
+from .onchain_methods import batch_request
+
+
+logger = logging.getLogger(__name__)
+
+
+class ReceiptTracker:
+    """
+    Pending transaction registry -
+    A single background thread polls receipts of all pending
+    transactions as one JSON-RPC batch every poll_interval seconds
+    """
+    def __init__(self,
+                 get_w3,
+                 poll_interval: float = 2,
+                 pending_timeout: float = 3600,
+                 retention: int = 100000):
+        self.get_w3 = get_w3
+        self.poll_interval = poll_interval
+        self.pending_timeout = pending_timeout
+        self.lock = Lock()
+        self.stopped = Event()
+        self.thread = None
+        self.pending = {}
+        self.results = LRUCache(retention)
+
+    @property
+    def w3(self):
+        return self.get_w3()
+
+    @staticmethod
+    def _key(tx_hash) -> str:
+        return HexBytes(tx_hash).hex().lower()
+
+    def track(self, tx_hash) -> str:
+        """
+        Register dispatched transaction, returns its hex hash
+        """
+        tx_hash = self._key(tx_hash)
+        with self.lock:
+            self.pending[tx_hash] = monotonic()
+        self.start()
+        return tx_hash
+
+    def status(self, tx_hash) -> dict:
+        """
+        Status of tracked transaction:
+            - pending
+            - confirmed / failed (with block number and gas used)
+            - dropped (not mined within pending_timeout)
+            - unknown (no receipt on chain)
+        Hashes not in the registry (e.g. submitted through another worker,
+        or evicted) are looked up with a single receipt request
+        """
+        tx_hash = self._key(tx_hash)
+        with self.lock:
+            if tx_hash in self.pending:
+                return {'tx_hash': tx_hash, 'status': "pending"}
+        result = self.results.get(tx_hash)
+        if result is None:
+            result = self.lookup(tx_hash)
+        if result is None:
+            return {'tx_hash': tx_hash, 'status': "unknown"}
+        return dict(result, tx_hash=tx_hash)
+
+    @staticmethod
+    def _result(receipt: dict) -> dict:
+        """
+        Status of a mined transaction from its raw receipt
+        """
+        return {
+            'status': "confirmed" if int(receipt['status'], 16) else "failed",
+            'block_number': int(receipt['blockNumber'], 16),
+            'gas_used': int(receipt['gasUsed'], 16)
+        }
+
+    def lookup(self, tx_hash: str) -> Optional[dict]:
+        """
+        Fetch receipt of an untracked transaction (retained once mined)
+        """
+        try:
+            response = self.w3.provider.make_request(
+                "eth_getTransactionReceipt", [tx_hash])
+        except Exception:
+            logger.warning("Receipt lookup of %s failed", tx_hash)
+            return None
+        receipt = response.get('result')
+        if not receipt:
+            return None
+        result = self._result(receipt)
+        self.results.set(tx_hash, result)
+        return result
+
+    def poll(self) -> None:
+        """
+        Fetch receipts of all pending transactions in one batch
+        """
+        with self.lock:
+            pending = list(self.pending.items())
+        if not pending:
+            return
+        responses = batch_request(self.w3, "eth_getTransactionReceipt",
+                                  [[tx_hash] for tx_hash, _ in pending])
+        now = monotonic()
+        for (tx_hash, submitted), response in zip(pending, responses):
+            receipt = response.get('result')
+            if receipt:
+                result = self._result(receipt)
+            elif now - submitted > self.pending_timeout:
+                result = {'status': "dropped"}
+            else:
+                continue
+            self.results.set(tx_hash, result)
+            with self.lock:
+                self.pending.pop(tx_hash, None)
+
+    def _run(self) -> None:
+        """
+        Background polling loop
+        """
+        while not self.stopped.wait(self.poll_interval):
+            try:
+                self.poll()
+            except Exception:
+                # Node hiccups are retried on the next interval
+                logger.warning("Receipt polling failed, retrying")
+
+    def start(self) -> None:
+        """
+        Start background polling thread (once)
+        """
+        if self.thread is not None:
+            return
+        with self.lock:
+            if self.thread is None:
+                self.thread = Thread(target=self._run,
+                                     name="receipt-tracker",
+                                     daemon=True)
+                self.thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop background polling thread
+        """
+        self.stopped.set()
+
+
+receipt_tracker = ReceiptTracker(
+    get_w3,
+    poll_interval=float(getenv('RECEIPT_POLL_INTERVAL', '2')),
+    pending_timeout=float(getenv('RECEIPT_PENDING_TIMEOUT', '3600')))
@@ -0,0 +1,75 @@
+"""
+Unlocked Signer Sessions
+Holds decrypted accounts in memory for a short idle period so that
+operators do not resend (and the API does not redecrypt) their key
+on every transaction
+Sessions live only in the memory of the worker process that unlocked
+them (decrypted keys are deliberately never shared or persisted), so
+multi-worker deployments must route each client to one worker (sticky
+sessions) or run the API as a single worker
+"""
+from secrets import token_urlsafe
+from threading import Lock
+from time import monotonic
+
+from eth_account.signers.local import LocalAccount
+
+from ..exceptions.exception_objects import SignerSessionError
+
+
+class SignerSessions:
+    """
+    Opaque handle -> unlocked account registry
+    Sessions are bound to their user and expire after idle_ttl
+    seconds without use
+    """
+    def __init__(self, idle_ttl: float = 300):
+        self.idle_ttl = idle_ttl
+        self.lock = Lock()
+        self.sessions = {}
+
+    def _purge(self) -> None:
+        """
+        Drop expired sessions
+        Caller must hold self.lock
+        """
+        now = monotonic()
+        for handle in [
+                handle for handle, (_, _, expiry) in self.sessions.items()
+                if expiry <= now
+        ]:
+            del self.sessions[handle]
+
+    def unlock(self, user_id: str, account: LocalAccount) -> str:
+        """
+        Register unlocked account, returns its session handle
+        """
+        handle = token_urlsafe(32)
+        with self.lock:
+            self._purge()
+            self.sessions[handle] = (user_id, account,
+                                     monotonic() + self.idle_ttl)
+        return handle
+
+    def get(self, handle: str, user_id: str) -> LocalAccount:
+        """
+        Get unlocked account of session, refreshing its idle timeout
+        """
+        with self.lock:
+            self._purge()
+            session = self.sessions.get(handle)
+            if session is None or session[0] != user_id:
+                raise SignerSessionError
+            self.sessions[handle] = (user_id, session[1],
+                                     monotonic() + self.idle_ttl)
+            return session[1]
+
+    def lock_session(self, handle: str, user_id: str) -> None:
+        """
+        Explicitly end session
+        """
+        with self.lock:
+            session = self.sessions.get(handle)
+            if session is None or session[0] != user_id:
+                raise SignerSessionError
+            del self.sessions[handle]
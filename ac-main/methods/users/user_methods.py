@@ -1,16 +1,34 @@
 """
 User Methods/Functions
 """
+from os import getenv
+from typing import Dict, List
+
+from eth_utils import is_hex_address, to_checksum_address
 from shortuuid import ShortUUID
-from sqlalchemy import or_
+from sqlalchemy import func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, load_only
 
-from ..cryptography import aes_methods, sha_methods
+from ..caching.cache_objects import TTLCache
+from ..cryptography import aes_methods, kdf_methods
 from ..database import db_schemas
 from ..exceptions.exception_objects import UnknownAccountError
+from ..metrics.metrics_methods import register_cache
 from . import user_objects
 
 
+USER_ID_LENGTH = 10
+USER_ID_ALPHABET = set(ShortUUID().get_alphabet())
+
+# Public keys never change, entries only expire to bound staleness of
+# deleted accounts
+publickey_cache = TTLCache(
+    maxsize=int(getenv('PUBLICKEY_CACHE_SIZE', '4096')),
+    ttl=float(getenv('PUBLICKEY_CACHE_TTL', '300')))
+register_cache("publickeys", publickey_cache)
+
+
 def create_user(database: Session, w3,
                 user: user_objects.User) -> db_schemas.User:
     """
@@ -23,10 +41,10 @@ def create_user(database: Session, w3,
     # USERS MUST STORE KEY WHERE IT WILL NOT BE LOST
     accesskey = aes_methods.aes_encrypt(privkey_raw, user.passkey)
     # Hashing user password
-    passkey = sha_methods.create_hash(user.passkey)
+    passkey = kdf_methods.create_hash(user.passkey)
     # Committing to database
     db_user = db_schemas.User(
-        id=ShortUUID().random(length=10),
+        id=ShortUUID().random(length=USER_ID_LENGTH),
         username=user.username,
         email=user.email,
         publickey=pubkey,
@@ -40,21 +58,89 @@ def create_user(database: Session, w3,
     return db_user
 
 
-def verify_user(database: Session, user_attr: str,
-                passkey: str) -> db_schemas.User:
+async def authenticate_user(database: AsyncSession, user_attr: str,
+                            passkey: str) -> db_schemas.User:
     """
-    Verify user by password
+    Verify user by password, hashing on the bounded KDF executor
+    Legacy or outdated hashes are upgraded upon successful verification
     """
-    db_user = get_user_by(database, user_attr)
+    db_user = await get_user_by_async(database, user_attr)
     if not db_user:
         return False
-    if not sha_methods.verify_hash(passkey, db_user.passkey):
+    if not await kdf_methods.run_kdf(kdf_methods.verify_hash, passkey,
+                                     db_user.passkey):
         return False
+    if kdf_methods.needs_rehash(db_user.passkey):
+        db_user.passkey = await kdf_methods.run_kdf(kdf_methods.create_hash,
+                                                    passkey)
+        await database.commit()
     # Returning user object
     return db_user
 
 
-def get_user_by(database: Session, user_attr: str) -> db_schemas.User:
+def classify_user_attr(user_attr: str) -> str:
+    """
+    Classify user attribute as one of:
+        - publickey (0x-prefixed address)
+        - email
+        - id (10-character ShortUUID)
+        - username
+    """
+    if is_hex_address(user_attr):
+        return "publickey"
+    if "@" in user_attr:
+        return "email"
+    if len(user_attr) == USER_ID_LENGTH and set(user_attr) <= USER_ID_ALPHABET:
+        return "id"
+    return "username"
+
+
+def user_field_condition(field: str, user_attr: str):
+    """
+    Filter condition matching user by a single uniquely indexed field
+    Emails and usernames are matched case-insensitively
+    """
+    user_table = db_schemas.User
+    if field == "publickey":
+        return user_table.publickey == bytes(to_checksum_address(user_attr),
+                                             'utf-8')
+    if field == "email":
+        return func.lower(user_table.email) == user_attr.lower()
+    if field == "username":
+        return func.lower(user_table.username) == user_attr.lower()
+    return user_table.id == user_attr
+
+
+def get_user_by_field(database: Session,
+                      field: str,
+                      user_attr: str,
+                      *columns: str) -> db_schemas.User:
+    """
+    Get user by a single uniquely indexed field
+    """
+    query = database.query(db_schemas.User).filter(
+        user_field_condition(field, user_attr))
+    if columns:
+        query = query.options(load_only(*columns))
+    return query.first()
+
+
+async def get_user_by_field_async(database: AsyncSession,
+                                  field: str,
+                                  user_attr: str,
+                                  *columns: str) -> db_schemas.User:
+    """
+    Get user by a single uniquely indexed field (asynchronous session)
+    """
+    statement = select(db_schemas.User).where(
+        user_field_condition(field, user_attr))
+    if columns:
+        statement = statement.options(load_only(*columns))
+    return (await database.execute(statement.limit(1))).scalars().first()
+
+
+def get_user_by(database: Session, user_attr: str,
+                *columns: str) -> db_schemas.User:
     """
     Get user by:
         - username
@@ -62,30 +148,100 @@ def get_user_by(database: Session, user_attr: str) -> db_schemas.User:
         - emails
         - ID
     """
-    db_user = (database.query(db_schemas.User).filter(
-        or_(
-            db_schemas.User.username == user_attr,
-            db_schemas.User.publickey == bytes(user_attr, 'utf-8'),
-            db_schemas.User.email == user_attr,
-            db_schemas.User.id == user_attr,
-        )).first())
+    field = classify_user_attr(user_attr)
+    db_user = get_user_by_field(database, field, user_attr, *columns)
+    # Address-, email- and ID-shaped attributes may equally be usernames
+    if db_user is None and field != "username":
+        db_user = get_user_by_field(database, "username", user_attr, *columns)
     # Returning user object
     return db_user
 
 
+async def get_user_by_async(database: AsyncSession, user_attr: str,
+                            *columns: str) -> db_schemas.User:
+    """
+    Get user by username, public key, email or ID (asynchronous session)
+    """
+    field = classify_user_attr(user_attr)
+    db_user = await get_user_by_field_async(database, field, user_attr,
+                                            *columns)
+    # Address-, email- and ID-shaped attributes may equally be usernames
+    if db_user is None and field != "username":
+        db_user = await get_user_by_field_async(database, "username",
+                                                user_attr, *columns)
+    return db_user
+
+
 def get_user_publickey(database: Session, user_attr: str) -> bytes:
     """
     Get public key of user
+    Hot resolutions are served from a short-lived cache
     """
-    publickey = (database.query(db_schemas.User).filter(
-        or_(db_schemas.User.username == user_attr,
-            db_schemas.User.email == user_attr,
-            db_schemas.User.id == user_attr)).options(
-                load_only('publickey')).first())
-    if not publickey:
+    publickey = publickey_cache.get(user_attr)
+    if publickey is not None:
+        return publickey
+    db_user = get_user_by(database, user_attr, 'publickey')
+    if not db_user:
         raise UnknownAccountError
+    publickey_cache.set(user_attr, db_user.publickey)
     # Returns users public key
-    return publickey.publickey
+    return db_user.publickey
+
+
+def get_user_publickeys(database: Session,
+                        user_attrs: List[str]) -> Dict[str, bytes]:
+    """
+    Get public keys of several users in one query
+    Returns mapping of user attribute to public key, unknown users are left out
+    """
+    publickeys, lookups = {}, {}
+    for user_attr in set(user_attrs):
+        publickey = publickey_cache.get(user_attr)
+        if publickey is not None:
+            publickeys[user_attr] = publickey
+            continue
+        field = classify_user_attr(user_attr)
+        if field == "publickey":
+            lookups[user_attr] = [(field,
+                                   bytes(to_checksum_address(user_attr),
+                                         'utf-8'))]
+        elif field == "id":
+            lookups[user_attr] = [(field, user_attr)]
+        else:
+            lookups[user_attr] = [(field, user_attr.lower())]
+        # Address-, email- and ID-shaped attributes may equally be usernames
+        if field != "username":
+            lookups[user_attr].append(("username", user_attr.lower()))
+    if not lookups:
+        return publickeys
+    keys = {field: set() for field in ("publickey", "email", "username", "id")}
+    for candidates in lookups.values():
+        for field, key in candidates:
+            keys[field].add(key)
+    user_table = db_schemas.User
+    db_users = database.query(
+        user_table.id, user_table.publickey, user_table.email,
+        user_table.username).filter(
+            or_(user_table.publickey.in_(keys["publickey"]),
+                func.lower(user_table.email).in_(keys["email"]),
+                func.lower(user_table.username).in_(keys["username"]),
+                user_table.id.in_(keys["id"]))).all()
+    found = {}
+    for db_user in db_users:
+        found["publickey", db_user.publickey] = db_user.publickey
+        found["id", db_user.id] = db_user.publickey
+        if db_user.email:
+            found["email", db_user.email.lower()] = db_user.publickey
+        if db_user.username:
+            found["username", db_user.username.lower()] = db_user.publickey
+    for user_attr, candidates in lookups.items():
+        for candidate in candidates:
+            if candidate in found:
+                publickey_cache.set(user_attr, found[candidate])
+                publickeys[user_attr] = found[candidate]
+                break
+    # Returns users public keys
+    return publickeys
 
 
 def get_users(database: Session,
@@ -0,0 +1,92 @@
+"""
+Test configuration
+Environment is set before any application module is imported (settings
+are read at import time); contract ABI modules, generated at deploy time
+and not committed, are provided from the bundled benchmark contracts
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+AC_MAIN = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKDIR = tempfile.mkdtemp(prefix="ac-tests-")
+
+os.environ.update({
+    'DATABASE_URL': f"sqlite:///{WORKDIR}/tests.db",
+    'IPFS_URL': "/ip4/127.0.0.1/tcp/5001",
+    'JWTKEY': "tests-jwt-key",
+    'INGEST_START_BLOCK': "0",
+    'GAS_REFRESH_INTERVAL': "0",
+    'RECEIPT_POLL_INTERVAL': "0.1"
+})
+sys.path.insert(0, AC_MAIN)
+
+from benchmark import (  # noqa: E402
+    BENCH_CONTRACTS,
+    install_abi_module,
+    load_artifact,
+)
+
+PROXY_ARTIFACT = load_artifact(os.path.join(BENCH_CONTRACTS,
+                                            "BenchProxy.json"))
+ITEM_ARTIFACT = load_artifact(os.path.join(BENCH_CONTRACTS, "BenchItem.json"))
+install_abi_module("ProxyContractABI", PROXY_ARTIFACT['abi'])
+install_abi_module("ItemContractABI", ITEM_ARTIFACT['abi'])
+
+
+@pytest.fixture(scope="session")
+def database():
+    """
+    Schema of the temporary SQLite database, returns its session factory
+    """
+    from methods.database.database import Base, SessionLocal, engine
+    from methods.database.db_migrations import migrate_db
+
+    Base.metadata.create_all(bind=engine)
+    migrate_db(engine)
+    return SessionLocal
+
+
+@pytest.fixture(scope="session")
+def chain(database):
+    """
+    In-process EVM served over JSON-RPC, with the benchmark contracts
+    deployed and one funded operator owning a brand contract
+    """
+    pytest.importorskip("eth_tester")
+    import ipfshttpclient
+    from benchmark import FakeIPFS, TesterRPC, deploy_artifact
+
+    rpc = TesterRPC()
+    deployer = rpc.w3.eth.accounts[0]
+    template = deploy_artifact(rpc, ITEM_ARTIFACT, deployer)
+    proxy_address = deploy_artifact(rpc, PROXY_ARTIFACT, deployer, template)
+    os.environ.update({
+        'WEB3_URL': rpc.serve(),
+        'PROXY_ADDRESS': proxy_address
+    })
+    fake_ipfs = FakeIPFS()
+    ipfshttpclient.connect = lambda *args, **kwargs: fake_ipfs
+
+    proxy = rpc.w3.eth.contract(address=proxy_address,
+                                abi=PROXY_ARTIFACT['abi'])
+    operator = rpc.w3.eth.account.create()
+    rpc.transact(rpc.w3.eth.send_transaction, {
+        'from': deployer,
+        'to': operator.address,
+        'value': rpc.w3.toWei(100, 'ether')
+    })
+    rpc.transact(
+        proxy.functions.deployContract(operator.address).transact,
+        {'from': deployer})
+    brand_contract = rpc.transact(proxy.functions.operators(
+        operator.address).call)
+    yield {
+        'rpc': rpc,
+        'ipfs': fake_ipfs,
+        'operator': operator,
+        'brand_contract': brand_contract
+    }
+    rpc.server.shutdown()
@@ -0,0 +1,109 @@
+"""
+Event ingestion (TokenFilters.apply) tests
+"""
+import pytest
+
+from methods.database.db_filter import TokenFilters
+from methods.database.db_schemas import Item, Operator, Owner, User
+
+BRAND = "0x00000000000000000000000000000000000000b1"
+OPERATOR = "0x00000000000000000000000000000000000000a1"
+RECEIVER = "0x00000000000000000000000000000000000000a2"
+
+
+def events(mints=(), burns=(), deploys=(), transfers=()) -> dict:
+    return {
+        'Mint': [{
+            'args': {
+                'itemid': item_id,
+                'contadr': BRAND
+            }
+        } for item_id in mints],
+        'Burn': [{
+            'args': {
+                'itemid': item_id,
+                'contadr': BRAND
+            }
+        } for item_id in burns],
+        'Deploy': [{
+            'args': {
+                'operator': operator,
+                'contadr': BRAND
+            }
+        } for operator in deploys],
+        'ItemTransfer': [{
+            'address': BRAND,
+            'args': {
+                'itemid': item_id,
+                'to': to
+            }
+        } for item_id, to in transfers]
+    }
+
+
+@pytest.fixture
+def token_filters(database):
+    db = database()
+    db.query(Owner).delete()
+    db.query(Item).delete()
+    db.query(Operator).delete()
+    db.query(User).delete()
+    db.add(User(id="operator-id", publickey=OPERATOR.encode()))
+    db.commit()
+    # Only apply() is exercised, which needs no contract
+    token_filters = TokenFilters.__new__(TokenFilters)
+    token_filters.db = db
+    yield token_filters
+    db.close()
+
+
+def owners(db) -> dict:
+    return {
+        owner.item_id: owner.owner.decode()
+        for owner in db.query(Owner)
+    }
+
+
+def test_deploy_and_mint_index_operator_and_owners(token_filters):
+    db = token_filters.db
+    token_filters.apply(events(deploys=[OPERATOR], mints=[1, 2]))
+    db.commit()
+    assert db.query(Operator).one().contract.decode() == BRAND
+    assert sorted(item.id for item in db.query(Item)) == [1, 2]
+    assert owners(db) == {1: OPERATOR, 2: OPERATOR}
+
+
+def test_last_transfer_wins(token_filters):
+    db = token_filters.db
+    token_filters.apply(events(deploys=[OPERATOR], mints=[1]))
+    token_filters.apply(
+        events(transfers=[(1, RECEIVER), (1, OPERATOR), (1, RECEIVER)]))
+    db.commit()
+    assert owners(db) == {1: RECEIVER}
+
+
+def test_burn_drops_item_and_owner(token_filters):
+    db = token_filters.db
+    token_filters.apply(events(deploys=[OPERATOR], mints=[1, 2]))
+    token_filters.apply(events(burns=[1]))
+    db.commit()
+    assert [item.id for item in db.query(Item)] == [2]
+    assert owners(db) == {2: OPERATOR}
+
+
+def test_replays_are_idempotent(token_filters):
+    db = token_filters.db
+    batch = events(deploys=[OPERATOR], mints=[1], transfers=[(1, RECEIVER)])
+    token_filters.apply(batch)
+    token_filters.apply(batch)
+    db.commit()
+    assert db.query(Operator).count() == 1
+    assert db.query(Item).count() == 1
+    assert owners(db) == {1: RECEIVER}
+
+
+def test_deploys_of_unknown_users_are_ignored(token_filters):
+    db = token_filters.db
+    token_filters.apply(events(deploys=[RECEIVER]))
+    db.commit()
+    assert db.query(Operator).count() == 0
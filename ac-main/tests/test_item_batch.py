@@ -0,0 +1,148 @@
+"""
+Bulk item token tests against an in-process chain
+"""
+import pytest
+from starlette.testclient import TestClient
+
+from methods.database.db_filter import TokenFilters
+from methods.database.db_schemas import User
+from methods.items import item_methods
+from methods.items.item_objects import ItemCreate, ItemTransfer
+from methods.onchain.ItemContractABI import ItemContractABI
+from methods.onchain.onchain_config import get_proxy_contract, nonce_manager
+from methods.onchain.onchain_methods import build_items_call
+from methods.onchain.onchain_objects import ProxyTXReqs
+from methods.onchain.onchain_receipts import receipt_tracker
+
+
+@pytest.fixture(scope="module")
+def accounts(chain, database):
+    """
+    Operator and transfer receiver users
+    """
+    receiver = chain['rpc'].w3.eth.account.create()
+    with database() as db:
+        for user_id, account in (("operator", chain['operator']),
+                                 ("receiver", receiver)):
+            db.merge(
+                User(id=f"{user_id}-{account.address}",
+                     publickey=account.address.encode(),
+                     username=f"{user_id}-{account.address}".lower()))
+        db.commit()
+    return {
+        'operator': chain['operator'],
+        'receiver': receiver,
+        'receiver_username': f"receiver-{receiver.address}".lower()
+    }
+
+
+def ingest(database) -> None:
+    with database() as db:
+        TokenFilters(db, get_proxy_contract()).filter()
+
+
+def mint(chain, database, count: int) -> list:
+    """
+    Mint count items as the operator (batch), returns their IDs
+    """
+    proxy = get_proxy_contract()
+    first_id = proxy.functions.nextItemId().call()
+    tx_reqs = ProxyTXReqs(target=chain['brand_contract'],
+                          privatekey=b"",
+                          account=chain['operator'])
+    items = [
+        ItemCreate(name=f"Item {index}",
+                   description="Test item",
+                   image="https://example.com/item.png",
+                   brand="Test",
+                   attributes=[]) for index in range(count)
+    ]
+    results = item_methods.create_item_batch(items, chain['ipfs'], tx_reqs)
+    assert [result['error'] for result in results] == [None] * count
+    assert all(result['tx_hash'] for result in results)
+    ingest(database)
+    return list(range(first_id, first_id + count))
+
+
+def test_create_item_batch_uses_consecutive_nonces(chain, database,
+                                                   accounts):
+    item_ids = mint(chain, database, 3)
+    w3 = chain['rpc'].w3
+    operator = chain['operator'].address
+    for item_id in item_ids:
+        assert chain['rpc'].transact(
+            w3.eth.contract(address=chain['brand_contract'],
+                            abi=ItemContractABI).functions.ownerOf(
+                                item_id).call) == operator
+    assert nonce_manager.nonces[operator] == chain['rpc'].transact(
+        w3.eth.get_transaction_count, operator)
+
+
+def test_get_items_owner_reports_per_item_failures(chain, database,
+                                                   accounts):
+    item_ids = mint(chain, database, 2)
+    requested = item_ids + [10**6]
+    with database() as db:
+        results = item_methods.get_items_owner(
+            requested, build_items_call(requested, db), db)
+    operator = accounts['operator'].address
+    assert [result['result']['publickey'] for result in results[:2]
+            ] == [operator, operator]
+    assert results[0]['result']['id'] == f"operator-{operator}"
+    assert results[2]['error'] == "Nonexistent token"
+
+
+def test_transfer_item_batch(chain, database, accounts):
+    item_ids = mint(chain, database, 2)
+    transfers = [
+        ItemTransfer(item_id=item_ids[0],
+                     receiver=accounts['receiver_username']),
+        ItemTransfer(item_id=item_ids[1], receiver="nobody"),
+        ItemTransfer(item_id=10**6, receiver=accounts['receiver_username'])
+    ]
+    with database() as db:
+        tx_reqs_map = build_items_call(item_ids, db)
+        for tx_reqs in tx_reqs_map.values():
+            tx_reqs.account = accounts['operator']
+        results = item_methods.transfer_item_batch(transfers, tx_reqs_map,
+                                                   db)
+        assert results[0]['tx_hash'] and results[0]['error'] is None
+        assert results[1]['error'] == "Unknown receiver"
+        assert results[2]['error'] == "Nonexistent token"
+        owner = item_methods.read_items([item_ids[0]], tx_reqs_map,
+                                        "ownerOf")[0]['result']
+        assert owner == accounts['receiver'].address
+
+        # No longer the owner: the gas estimate reverts, nothing is sent
+        nonce = nonce_manager.nonces[accounts['operator'].address]
+        results = item_methods.transfer_item_batch(transfers[:1],
+                                                   tx_reqs_map, db)
+        assert results[0]['tx_hash'] is None and results[0]['error']
+        assert nonce_manager.nonces[accounts['operator'].address] == nonce
+
+
+def test_bulk_read_endpoints(chain, database, accounts):
+    from ac_http_api import app
+
+    item_ids = mint(chain, database, 2)
+    client = TestClient(app)
+    params = [('item_ids', item_id) for item_id in item_ids + [10**6]]
+    owners = client.get("/items/view/owner/bulk", params=params)
+    assert owners.status_code == 200
+    assert [result['error'] for result in owners.json()
+            ] == [None, None, "Nonexistent token"]
+    items = client.get("/items/get/bulk", params=params).json()
+    assert [result['result']['name'] for result in items[:2]
+            ] == ["Item 0", "Item 1"]
+    assert items[2]['error'] == "Nonexistent token"
+
+
+def test_receipt_status_of_untracked_transaction(chain):
+    rpc = chain['rpc']
+    tx_hash = rpc.transact(rpc.w3.eth.send_transaction, {
+        'from': rpc.w3.eth.accounts[1],
+        'to': rpc.w3.eth.accounts[2],
+        'value': 1
+    })
+    assert receipt_tracker.status(tx_hash)['status'] == "confirmed"
+    assert receipt_tracker.status("0x" + "00" * 32)['status'] == "unknown"
@@ -0,0 +1,45 @@
+"""
+Item HTTP cache validator tests
+"""
+from methods.items.item_etag import (
+    ITEM_CACHE_MAX_AGE,
+    cache_headers,
+    etag_matches,
+    value_etag,
+)
+
+
+def test_value_etag_is_stable_and_quoted():
+    etag = value_etag("owner", 1, "0xA")
+    assert etag == value_etag("owner", 1, "0xA")
+    assert etag.startswith('"') and etag.endswith('"')
+
+
+def test_value_etag_changes_with_view_item_and_value():
+    etag = value_etag("owner", 1, "0xA")
+    assert etag != value_etag("owner", 1, "0xB")
+    assert etag != value_etag("owner", 2, "0xA")
+    assert etag != value_etag("claimability", 1, "0xA")
+
+
+def test_etag_matches_weak_comparison():
+    etag = value_etag("item", 1, "bafy")
+    assert etag_matches(etag, etag)
+    assert etag_matches(f"W/{etag}", etag)
+    assert etag_matches(f'"other", {etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"other"', etag)
+    assert not etag_matches(None, etag)
+
+
+def test_etag_matches_nothing_without_etag():
+    assert not etag_matches("*", None)
+
+
+def test_cache_headers():
+    assert cache_headers(None) == {
+        'Cache-Control': f"public, max-age={ITEM_CACHE_MAX_AGE}"
+    }
+    headers = cache_headers('"tag"', private=True)
+    assert headers['Cache-Control'].startswith("private")
+    assert headers['ETag'] == '"tag"'
@@ -0,0 +1,52 @@
+"""
+Nonce manager tests
+"""
+from methods.onchain.onchain_nonce import NonceManager, is_nonce_error
+
+
+class FakeEth:
+    def __init__(self, count: int):
+        self.count = count
+        self.syncs = 0
+
+    def getTransactionCount(self, address: str, block: str) -> int:
+        self.syncs += 1
+        return self.count
+
+
+class FakeWeb3:
+    def __init__(self, count: int):
+        self.eth = FakeEth(count)
+
+
+def test_reserve_hands_out_consecutive_nonces_syncing_once():
+    w3 = FakeWeb3(7)
+    nonce_manager = NonceManager(lambda: w3)
+    assert nonce_manager.reserve("0xA", 3) == 7
+    assert nonce_manager.next_nonce("0xA") == 10
+    assert nonce_manager.reserve("0xA", 2) == 11
+    assert w3.eth.syncs == 1
+
+
+def test_counters_are_per_sender():
+    w3 = FakeWeb3(4)
+    nonce_manager = NonceManager(lambda: w3)
+    assert nonce_manager.reserve("0xA", 5) == 4
+    assert nonce_manager.reserve("0xB") == 4
+
+
+def test_resync_discards_local_counter():
+    w3 = FakeWeb3(2)
+    nonce_manager = NonceManager(lambda: w3)
+    nonce_manager.reserve("0xA", 10)
+    w3.eth.count = 5
+    assert nonce_manager.resync("0xA") == 5
+    assert nonce_manager.next_nonce("0xA") == 5
+    assert w3.eth.syncs == 2
+
+
+def test_is_nonce_error():
+    assert is_nonce_error(ValueError({'message': "Nonce too low"}))
+    assert is_nonce_error(
+        ValueError("replacement transaction underpriced"))
+    assert not is_nonce_error(ValueError("execution reverted"))